@@ -0,0 +1,306 @@
+"""Tool-calling bridge assistant.
+
+Instead of the whole model state, the chat model gets a set of typed
+tools (``TOOLS``, OpenAI function-calling schemas) and asks for what it
+needs. The calls are served by ``BridgeTools`` on a snapshot of the form
+parameters and the current model:
+
+- ``get_parameters`` / ``set_parameters``: read and change the parametric
+  inputs; changes are collected and applied to the UI afterwards.
+- ``get_model_info``: node, line and surface counts and the spans.
+- ``run_preview_analysis``: local linear-static solve (results cached).
+- ``get_span_results``: per-span maximum vertical deflection.
+- ``run_code_checks``: ``checks.check_spans`` for a rule set.
+
+``converse`` runs the call/answer rounds, streaming each round through a
+``JsonStreamParser``, and returns the final answer text; the parameter
+changes made along the way are in ``BridgeTools.changes``. ``ask`` is
+one chat request as ``BridgeUI.run_llm_command`` sends it, cache included.
+"""
+import json
+import time
+
+import metrics
+from checks import RULE_SETS, check_spans, span_deflections
+from llm_cache import get_llm_cache, request_key
+from objects import span_ranges
+from regen import PARAM_EFFECTS, BridgeModel
+
+MAX_ROUNDS = 6
+MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = """
+You are an assistant for parametric bridge modeling.
+
+The engineer gives instructions in natural language.
+You have tools to read and change the bridge parameters, inspect the FE model,
+run the preview analysis, get per-span results and run code checks (EC, AASHTO).
+Call them for any number you need; do not guess values or recompute what a tool returns.
+
+- All units are in feet. Do NOT convert to meters or any other system.
+
+- If the instruction changes the model, call set_parameters with the new values.
+
+- Your final answer is always a JSON object with a single key:
+  {"message": "<your answer here>"}
+  For model changes, summarise what you changed.
+
+- For questions about analysis results or code compliance (e.g. "check deflection",
+  "is my span/depth ratio ok"), use run_code_checks and get_span_results and quote their values.
+  A utilisation above 1 fails. If values exceed the limit, provide corrective suggestions, such as:
+    - Increase girder depth
+    - Add more girders
+    - Reduce span length
+    - Adjust cross-frame spacing
+  Include these suggestions in the message.
+
+Never return free text outside JSON. Always return valid JSON only.
+"""
+
+_NUMBER = {"type": "number", "exclusiveMinimum": 0}
+_PARAMETERS = {
+    "span_lengths": {"type": "array", "items": _NUMBER, "minItems": 1},
+    "number_of_girders": {"type": "integer", "minimum": 1},
+    "girder_spacing": _NUMBER,
+    "girder_depth": _NUMBER,
+    "web_thickness": _NUMBER,
+    "flange_width": _NUMBER,
+    "flange_thickness": _NUMBER,
+    "deck_thickness": _NUMBER,
+    "overhang": {"type": "number", "minimum": 0},
+    "mesh_size": _NUMBER,
+    "min_mesh_size": {"type": "number", "minimum": 0},
+    "element_budget": {"type": "integer", "minimum": 0},
+    "crossframe_spacing": _NUMBER,
+}
+
+
+def _check_value(spec: dict, value) -> str | None:
+    if spec["type"] == "array":
+        if not isinstance(value, (list, tuple)) or len(value) < spec.get("minItems", 0):
+            return f"expected a list of at least {spec.get('minItems', 0)} values"
+        return next(filter(None, (_check_value(spec["items"], v) for v in value)), None)
+    number = int if spec["type"] == "integer" else (int, float)
+    if isinstance(value, bool) or not isinstance(value, number):
+        return f"expected {'an integer' if spec['type'] == 'integer' else 'a number'}"
+    if "minimum" in spec and not value >= spec["minimum"]:
+        return f"must be at least {spec['minimum']}"
+    if "exclusiveMinimum" in spec and not value > spec["exclusiveMinimum"]:
+        return f"must be greater than {spec['exclusiveMinimum']}"
+    return None
+
+
+def invalid_parameters(params: dict) -> dict[str, str]:
+    """``{name: reason}`` for the values in ``params`` outside the ``set_parameters`` schema.
+
+    The form is checked against the same bounds before generating.
+    """
+    return {k: reason for k, v in params.items()
+            if k in _PARAMETERS and (reason := _check_value(_PARAMETERS[k], v)) is not None}
+
+
+def _tool(name: str, description: str, properties: dict = None, required=()) -> dict:
+    return {"type": "function", "function": {
+        "name": name, "description": description,
+        "parameters": {"type": "object", "properties": properties or {}, "required": list(required)},
+    }}
+
+
+TOOLS = [
+    _tool("get_parameters", "Current bridge parameters (units: feet).",
+          {"keys": {"type": "array", "items": {"type": "string", "enum": list(_PARAMETERS)},
+                    "description": "only these parameters (default: all)"}}),
+    _tool("set_parameters", "Change bridge parameters; unspecified ones keep their value.", _PARAMETERS),
+    _tool("get_model_info", "Node, line and surface counts of the FE model and the span ranges."),
+    _tool("run_preview_analysis", "Run the local linear-static analysis (self-weight) of the current "
+          "parameters; returns the maximum deflection."),
+    _tool("get_span_results", "Maximum vertical deflection per span of the last analysis.",
+          {"spans": {"type": "array", "items": {"type": "integer", "minimum": 1},
+                     "description": "1-based span numbers (default: all)"}}),
+    _tool("run_code_checks", "Per-span deflection and span/depth checks (utilisation > 1 fails). "
+          "Runs the analysis first if needed.",
+          {"rule_set": {"type": "string", "enum": list(RULE_SETS)}}, required=["rule_set"]),
+]
+
+
+class BridgeTools:
+    """Serves the ``TOOLS`` calls for one request.
+
+    ``params`` is a snapshot of the form (``BridgeUI.params``). ``model``
+    is the UI's current ``BridgeModel``, if any. Its FEAModel is analysed
+    in place while the parameters match it, as the preview button does.
+    Once parameters are changed, work continues on a private copy.
+    """
+    def __init__(self, params: dict, model: BridgeModel = None, on_change=None):
+        self.params = dict(params)
+        self.changes = {}
+        self.on_change = on_change
+        self._base = model
+        self._model = None
+
+    def model(self) -> BridgeModel:
+        if self._model is None:
+            base = self._base
+            if base is not None and not base.changed(self.params):
+                self._model = base
+            elif base is not None and "topology" not in base.effects(self.params):
+                self._model = BridgeModel(base.params, base.fea.copy())
+                self._model.update(self.params)
+            else:
+                self._model = BridgeModel(self.params)
+        elif self._model.changed(self.params):
+            if self._model is self._base:
+                self._model = BridgeModel(self._base.params, self._base.fea.copy())
+            self._model.update(self.params)
+        return self._model
+
+    # --- tools ---
+    def get_parameters(self, keys=None) -> dict:
+        return {k: self.params[k] for k in (keys or self.params) if k in self.params}
+
+    def set_parameters(self, **changes) -> dict:
+        unknown = sorted(set(changes) - set(PARAM_EFFECTS))
+        if unknown:
+            return {"error": f"unknown parameters {unknown}", "accepted": list(PARAM_EFFECTS)}
+        invalid = invalid_parameters(changes)
+        if invalid:
+            return {"error": "invalid values, nothing was changed", "invalid": invalid}
+        self.params.update(changes)
+        self.changes.update(changes)
+        if self.on_change is not None:
+            self.on_change(changes)
+        return {"updated": changes}
+
+    def get_model_info(self) -> dict:
+        fea = self.model().fea
+        return {"n_nodes": fea.n_nodes, "n_lines": fea.n_lines, "n_surfaces": fea.n_surfaces,
+                "spans": [list(s) for s in span_ranges(fea)], "analysed": fea.displacements is not None}
+
+    def run_preview_analysis(self) -> dict:
+        from solver import solve_linear_static
+        fea = self.model().fea
+        solve_linear_static(fea)
+        return {"max_deflection": fea.max_deflection}
+
+    def get_span_results(self, spans=None) -> dict:
+        fea = self.model().fea
+        if fea.displacements is None:
+            return {"error": "no analysis results; call run_preview_analysis first"}
+        ranges = span_ranges(fea)
+        deflection = span_deflections(fea, ranges)
+        wanted = spans or range(1, len(ranges) + 1)
+        return {"spans": [{"span": i, "start": ranges[i - 1][0], "end": ranges[i - 1][1],
+                           "max_deflection": float(deflection[i - 1])}
+                          for i in wanted if 1 <= i <= len(ranges)]}
+
+    def run_code_checks(self, rule_set: str = "EC") -> dict:
+        if rule_set not in RULE_SETS:
+            return {"error": f"unknown rule set {rule_set!r}", "accepted": list(RULE_SETS)}
+        fea = self.model().fea
+        if fea.displacements is None:
+            self.run_preview_analysis()
+        return check_spans(fea, rule_set)
+
+    def call(self, name: str, arguments: str) -> str:
+        """Run tool ``name`` with JSON ``arguments``; the result (or error) as JSON."""
+        if name not in {t["function"]["name"] for t in TOOLS}:
+            return json.dumps({"error": f"unknown tool {name!r}"})
+        try:
+            args = json.loads(arguments or "{}")
+            with metrics.span("llm.tool", tool=name):
+                result = getattr(self, name)(**args)
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        return json.dumps(result, default=float)
+
+
+def stream_message(client, parser, **request) -> dict:
+    """One streamed completion round: the assistant message (content and tool calls)."""
+    content, calls = [], {}
+    with metrics.span("llm.round") as sp:
+        t0 = time.perf_counter()
+        for chunk in client.chat.completions.create(stream=True, stream_options={"include_usage": True},
+                                                     **request):
+            usage = getattr(chunk, "usage", None)
+            if usage is not None:
+                metrics.count("llm.prompt_tokens", usage.prompt_tokens)
+                metrics.count("llm.completion_tokens", usage.completion_tokens)
+            if not chunk.choices:
+                continue
+            if not content and not calls:
+                sp.set(first_chunk_ms=1e3 * (time.perf_counter() - t0))
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                if parser is not None:
+                    parser.feed(delta.content)
+            for tc in delta.tool_calls or ():
+                call = calls.setdefault(tc.index, {"id": "", "type": "function",
+                                                   "function": {"name": "", "arguments": ""}})
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function is not None:
+                    call["function"]["name"] += tc.function.name or ""
+                    call["function"]["arguments"] += tc.function.arguments or ""
+    message = {"role": "assistant", "content": "".join(content) or None}
+    if calls:
+        message["tool_calls"] = [calls[i] for i in sorted(calls)]
+    return message
+
+
+def converse(client, tools: BridgeTools, parser, messages: list, max_rounds: int = MAX_ROUNDS,
+             check=None, **request) -> str:
+    """Let the model call tools until it answers; returns the final answer text.
+
+    ``check()`` is called before every round (e.g. ``Task.check`` to stop
+    on cancellation).
+    """
+    messages = list(messages)
+    for _ in range(max_rounds):
+        if check is not None:
+            check()
+        message = stream_message(client, parser, messages=messages, tools=TOOLS, **request)
+        messages.append(message)
+        if "tool_calls" not in message:
+            return message["content"] or ""
+        for call in message["tool_calls"]:
+            messages.append({"role": "tool", "tool_call_id": call["id"],
+                             "content": tools.call(call["function"]["name"], call["function"]["arguments"])})
+    raise RuntimeError(f"no answer after {max_rounds} tool rounds")
+
+
+def ask(client, prompt: str, params: dict, model: BridgeModel = None, history=(), parser=None,
+        on_change=None, check=None, cache=None) -> tuple[str, dict]:
+    """Answer one instruction; returns the answer text and the parameter changes.
+
+    ``history`` is the previous (instruction, answer), if any. ``parser``
+    receives the answer (streamed, or at once from the cache) and
+    ``on_change(changes)`` each ``set_parameters`` call (replayed on a
+    cache hit). ``cache`` defaults to ``llm_cache.get_llm_cache()``.
+    """
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if history:
+        messages += [{"role": "user", "content": history[0]}, {"role": "assistant", "content": history[1]}]
+    messages.append({"role": "user", "content": prompt})
+
+    # tool results depend on the form and on the model (and its results) behind it
+    state = {"params": params, "model": model.params if model else None,
+             "analysed": model is not None and model.fea.displacements is not None}
+    key = request_key(MODEL, SYSTEM_PROMPT, prompt, state, history, temperature=0, tools=TOOLS)
+    tools = BridgeTools(params, model, on_change=on_change)
+    streamed = []
+
+    def fetch():
+        answer = converse(client, tools, parser, messages, check=check, model=MODEL, temperature=0)
+        streamed.append(True)
+        return json.dumps({"answer": answer, "changes": tools.changes})
+
+    cached = json.loads((cache or get_llm_cache()).complete(key, fetch))
+    if not streamed:
+        # cache hit, or answered by an identical request in flight
+        metrics.count("llm.cache_hits")
+        if parser is not None:
+            parser.feed(cached["answer"])
+        if cached["changes"] and on_change is not None:
+            on_change(cached["changes"])
+    return cached["answer"], cached["changes"]
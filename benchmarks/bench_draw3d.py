@@ -0,0 +1,59 @@
+"""Time draw_3d against element count.
+
+Run from the repo root:  python benchmarks/bench_draw3d.py
+"build" is draw_3d itself (artist creation), "render" one full canvas
+draw, which is what every rotate/zoom pays. In full detail both should
+stay roughly linear in the number of elements, with a fixed artist
+count; the coarse level of detail should stay flat.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from objects import build_fea
+from render import draw_3d
+
+
+def build_model(span_lengths, num_girders=5, spacing=3.0, depth=2.0, mesh_size=2.5, cross_spacing=5.0):
+    return build_fea({
+        "span_lengths": span_lengths,
+        "number_of_girders": num_girders,
+        "girder_spacing": spacing,
+        "girder_depth": depth,
+        "web_thickness": 0.2,
+        "flange_width": 0.5,
+        "flange_thickness": 0.05,
+        "deck_thickness": 0.25,
+        "overhang": 0.5,
+        "mesh_size": mesh_size,
+        "crossframe_spacing": cross_spacing,
+    })
+
+
+def main():
+    fig = plt.figure(figsize=(6, 4))
+    ax = fig.add_subplot(111, projection="3d")
+    print(f"{'mesh':>6} {'lod':>6} {'nodes':>7} {'elements':>9} {'artists':>8} {'build [s]':>10}"
+          f" {'render [s]':>11} {'us/elem':>8}")
+    for mesh_size in (4.0, 2.0, 1.0, 0.5, 0.25, 0.1, 0.05):
+        fea = build_model([30.0, 60.0, 30.0], mesh_size=mesh_size)
+        n_elem = fea.n_lines + fea.n_surfaces
+        for lod in ("full", "coarse"):
+            t0 = time.perf_counter()
+            draw_3d(fea, ax, lod=lod)
+            t1 = time.perf_counter()
+            fig.canvas.draw()
+            t2 = time.perf_counter()
+            artists = len(ax.collections) + len(ax.lines)
+            print(f"{mesh_size:>6} {lod:>6} {fea.n_nodes:>7} {n_elem:>9} {artists:>8} {t1 - t0:>10.3f}"
+                  f" {t2 - t1:>11.3f} {1e6*(t2 - t0)/n_elem:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
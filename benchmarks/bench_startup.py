@@ -0,0 +1,81 @@
+"""Cold import and startup times.
+
+Run from the repo root:  python benchmarks/bench_startup.py [--runs 5]
+Every measurement is a fresh interpreter (median of ``--runs``). "import"
+rows time importing one module; "first window" builds ``BridgeUI`` and
+processes Tk events until the window is drawn (skipped without a
+display). The meshing core (``objects``, ``regen``) should import in tens
+of milliseconds and without matplotlib, openai or dlubal; the heavy
+modules are listed per row.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ("objects", "regen", "checks", "assistant", "sweep", "main")
+HEAVY = ("matplotlib", "openai", "dlubal", "scipy", "pandas", "tkinter")
+
+_IMPORT = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+_WINDOW = """
+import time
+t0 = time.perf_counter()
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.BridgeUI(root)
+root.update()
+print(time.perf_counter() - t0)
+root.destroy()
+"""
+
+
+def _run(code: str) -> list[str] | None:
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.strip().splitlines()
+
+
+def measure(runs: int = 5) -> list[dict]:
+    rows = []
+    for module in MODULES:
+        outs = [_run(_IMPORT.format(module=module, heavy=HEAVY)) for _ in range(runs)]
+        if None in outs:
+            rows.append({"what": f"import {module}", "error": True})
+            continue
+        rows.append({"what": f"import {module}", "seconds": statistics.median(float(o[0]) for o in outs),
+                     "heavy": outs[0][1] if len(outs[0]) > 1 else ""})
+    outs = [_run(_WINDOW) for _ in range(runs)]
+    if None not in outs:
+        rows.append({"what": "first window", "seconds": statistics.median(float(o[0]) for o in outs)})
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args()
+    rows = measure(args.runs)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'':<18}{'ms':>8}  heavy modules loaded")
+    for row in rows:
+        ms = "error" if row.get("error") else f"{1e3 * row['seconds']:.0f}"
+        print(f"{row['what']:<18}{ms:>8}  {row.get('heavy', '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Replay a scripted chat session offline and time every stage.
+
+Run from the repo root:
+
+    python benchmarks/replay.py prompts.txt --repeat 5 --out replay.json
+    python benchmarks/replay.py prompts.txt --param mesh_size=0.5 --token-ms 20
+
+Each instruction goes through the same code as the UI: ``assistant.ask``
+(tools and LLM cache included), the ``update_from_dict`` /
+``generate_bridge`` steps (``regen.BridgeModel``) and ``fea_to_rfem``.
+The OpenAI client is replaced by ``ReplayClient``, which streams recorded
+answers (``benchmarks/recordings/<session>.jsonl``), and RFEM by
+``rfem_stub``. Caches are fresh for every repetition.
+
+The report is JSON: p50/p90/p99/max seconds per stage, peak RSS (via
+``psutil`` on Windows if installed, else null), peak traced allocations
+with ``--trace-memory``, and call counts.
+``--record`` runs the session against the real API and writes the
+recording instead.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace as NS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import assistant
+import llm_cache
+import results_cache
+import rfem_conn
+import rfem_session
+from llm_stream import JsonStreamParser
+from regen import BridgeModel, Changeset
+from rfem_stub import StubServer
+from sweep import DEFAULTS, _axis
+
+RECORDINGS = Path(__file__).parent / "recordings"
+STAGES = ("assistant", "tools", "parse", "generate", "export", "turn")
+
+
+def peak_rss() -> int | None:
+    """Peak resident memory of this process in bytes; None where it cannot be read."""
+    try:
+        import resource     # Unix only
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)   # peak working set on Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # macOS reports bytes, Linux KiB
+
+
+def load_session(path: Path) -> list[str]:
+    """Instructions of a session: one per line (.txt) or JSON lines with ``prompt`` (or ``title``)."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".jsonl":
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+        return [item.get("prompt") or item["title"] for item in items]
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+
+
+def _last_prompt(messages: list) -> tuple[str, int]:
+    """The current instruction and how many assistant rounds have answered it so far."""
+    last = max(i for i, m in enumerate(messages) if m["role"] == "user")
+    return messages[last]["content"], sum(m["role"] == "assistant" for m in messages[last + 1:])
+
+
+class ReplayClient:
+    """Stands in for ``openai.OpenAI``: streams recorded rounds per instruction.
+
+    A recording line is ``{"prompt": ..., "rounds": [...]}``; a round is
+    ``{"tool_calls": [{"name", "arguments"}]}`` or ``{"content": ...}``.
+    Content streams in ``chunk``-character pieces, ``token_ms`` apart.
+    Unrecorded instructions get a fixed message (counted in ``unrecorded``).
+    """
+    def __init__(self, recording: dict[str, list], chunk: int = 4, token_ms: float = 0.0):
+        self.recording = recording
+        self.chunk = chunk
+        self.token_ms = token_ms
+        self.chat = NS(completions=self)
+        self.rounds = 0
+        self.tool_calls = 0
+        self.unrecorded = 0
+        self.tool_time = 0.0     # between the end of a round and the next request
+        self._round_end = None
+
+    def begin(self):
+        self.tool_time, self._round_end = 0.0, None
+
+    def create(self, *, messages, stream=False, **request):
+        if self._round_end is not None:
+            self.tool_time += time.perf_counter() - self._round_end
+            self._round_end = None
+        prompt, i = _last_prompt(messages)
+        rounds = self.recording.get(prompt)
+        if rounds is None:
+            self.unrecorded += 1
+            rounds = [{"content": json.dumps({"message": "(no recorded answer)"})}]
+        self.rounds += 1
+        return self._stream(rounds[min(i, len(rounds) - 1)])
+
+    def _stream(self, round_: dict):
+        for k, call in enumerate(round_.get("tool_calls", ())):
+            self.tool_calls += 1
+            args = call["arguments"] if isinstance(call["arguments"], str) else json.dumps(call["arguments"])
+            fn = NS(name=call["name"], arguments=args)
+            yield NS(choices=[NS(delta=NS(content=None, tool_calls=[NS(index=k, id=f"call_{k}", function=fn)]))])
+        text = round_.get("content") or ""
+        for start in range(0, len(text), self.chunk):
+            if self.token_ms:
+                time.sleep(self.token_ms / 1000)
+            yield NS(choices=[NS(delta=NS(content=text[start:start + self.chunk], tool_calls=None))])
+        self._round_end = time.perf_counter()
+
+
+class RecordingClient:
+    """Wraps a real client and keeps every streamed round per instruction."""
+    def __init__(self, client):
+        self.client = client
+        self.chat = NS(completions=self)
+        self.recording: dict[str, list] = {}
+
+    def create(self, *, messages, **request):
+        prompt, _ = _last_prompt(messages)
+        rounds = self.recording.setdefault(prompt, [])
+        return self._tee(self.client.chat.completions.create(messages=messages, **request), rounds)
+
+    @staticmethod
+    def _tee(stream, rounds: list):
+        content, calls = [], {}
+        for chunk in stream:
+            yield chunk
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            content.append(delta.content or "")
+            for tc in delta.tool_calls or ():
+                call = calls.setdefault(tc.index, {"name": "", "arguments": ""})
+                call["name"] += tc.function.name or ""
+                call["arguments"] += tc.function.arguments or ""
+        rounds.append({"tool_calls": [calls[i] for i in sorted(calls)]} if calls else {"content": "".join(content)})
+
+
+class HeadlessSession:
+    """``BridgeUI``'s chat -> form -> generate -> export path, without Tk."""
+    def __init__(self, client, params: dict, export: bool = True, model_name: str = "ReplayBridge"):
+        self.client = client
+        self.params = dict(params)
+        self.export_enabled = export
+        self.model_name = model_name
+        self.model: BridgeModel = None
+        self.unexported = Changeset()
+        self.history = ()
+
+    def update_from_dict(self, changes: dict):
+        self.params.update({k: v for k, v in changes.items() if k in DEFAULTS})
+
+    def generate(self):
+        # BridgeUI.generate_bridge: in place unless the topology changes
+        if self.model is not None and "topology" not in self.model.effects(self.params):
+            changes = self.model.update(self.params)
+        else:
+            self.model = BridgeModel(self.params)
+            changes = Changeset(set(self.params), rebuilt=True)
+        self.unexported = self.unexported.merge(changes)
+
+    def export(self):
+        changes, self.unexported = self.unexported, Changeset()
+        rfem_conn.fea_to_rfem(self.model.fea, model_name=self.model_name, changes=changes)
+
+    def turn(self, prompt: str, timings: dict):
+        t0 = time.perf_counter()
+        parser = JsonStreamParser(on_field=lambda k, v: k != "message" and self.update_from_dict({k: v}))
+        begin = getattr(self.client, "begin", None)
+        if begin is not None:
+            begin()
+        answer, changes = assistant.ask(self.client, prompt, self.params, self.model, self.history, parser,
+                                        on_change=self.update_from_dict)
+        t1 = time.perf_counter()
+        tools = getattr(self.client, "tool_time", 0.0)
+        timings["tools"].append(tools)
+        timings["assistant"].append(t1 - t0 - tools)
+        self.history = (prompt, answer)
+
+        try:
+            update = parser.close()
+        except ValueError:
+            update = {}
+        if "message" not in update:
+            self.update_from_dict(update)
+        t2 = time.perf_counter()
+        timings["parse"].append(t2 - t1)
+
+        if self.model is None or changes or "message" not in update:
+            self.generate()
+        t3 = time.perf_counter()
+        timings["generate"].append(t3 - t2)
+
+        if self.export_enabled and self.unexported:
+            self.export()
+        t4 = time.perf_counter()
+        timings["export"].append(t4 - t3)
+        timings["turn"].append(t4 - t0)
+
+
+def _summary(values: list[float]) -> dict:
+    arr = np.asarray(values, dtype=float)
+    if not len(arr):
+        return {"n": 0}
+    p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+    return {"n": len(arr), "mean": arr.mean(), "p50": p50, "p90": p90, "p99": p99, "max": arr.max()}
+
+
+def replay(prompts: list[str], client, params: dict, repeat: int = 1, export: bool = True,
+           trace_memory: bool = False) -> dict:
+    """Run the session ``repeat`` times from scratch; returns the report dict."""
+    timings = {stage: [] for stage in STAGES}
+    server = StubServer()
+    if trace_memory:
+        tracemalloc.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        for r in range(repeat):
+            # nothing carries over between repetitions but the stub RFEM model;
+            # the export digests are dropped so each one starts with a full push
+            rfem_conn.reset_export_state()
+            llm_cache.set_llm_cache(llm_cache.LLMCache(":memory:", offline=False))
+            results_cache.set_cache(results_cache.ResultsCache(Path(tmp) / f"results{r}"))
+            rfem_session.set_pool(rfem_session.SessionPool(server.application))
+            session = HeadlessSession(client, params, export)
+            for prompt in prompts:
+                session.turn(prompt, timings)
+    report = {
+        "turns": len(prompts), "repeat": repeat, "params": params,
+        "nodes": session.model.fea.n_nodes if session.model else 0,
+        "stages": {stage: _summary(v) for stage, v in timings.items()},
+        "peak_rss_bytes": peak_rss(),
+        "llm": {k: getattr(client, k) for k in ("rounds", "tool_calls", "unrecorded") if hasattr(client, k)},
+        "rfem": dict(server.sent),
+    }
+    if trace_memory:
+        report["traced_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return report
+
+
+def load_recording(path: Path) -> dict[str, list]:
+    if not path.exists():
+        return {}
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return {item["prompt"]: item["rounds"] for item in map(json.loads, filter(str.strip, lines))}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("session", type=Path, help="prompts (.txt, one per line) or JSON lines (.jsonl)")
+    ap.add_argument("--recording", type=Path, help="recorded answers (default: recordings/<session>.jsonl)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--param", action="append", type=_axis, default=[], metavar="KEY=VALUE",
+                    help="starting parameter, JSON value (repeatable)")
+    ap.add_argument("--token-ms", type=float, default=0.0, help="simulated delay per streamed chunk")
+    ap.add_argument("--no-export", action="store_true", help="skip fea_to_rfem")
+    ap.add_argument("--trace-memory", action="store_true", help="also report peak traced allocations (slower)")
+    ap.add_argument("--record", action="store_true", help="run once against the OpenAI API and save the recording")
+    ap.add_argument("--out", type=Path, help="write the report here instead of stdout")
+    args = ap.parse_args(argv)
+
+    prompts = load_session(args.session)
+    recording_path = args.recording or RECORDINGS / f"{args.session.stem}.jsonl"
+    params = {**DEFAULTS, **{key: values[0] for key, values in args.param}}
+
+    if args.record:
+        from openai import OpenAI
+        from config import OPENAI_KEY
+        client = RecordingClient(OpenAI(api_key=OPENAI_KEY))
+        replay(prompts, client, params, repeat=1, export=not args.no_export)
+        recording_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(recording_path, "w", encoding="utf-8") as f:
+            for prompt in prompts:
+                f.write(json.dumps({"prompt": prompt, "rounds": client.recording.get(prompt, [])}) + "\n")
+        print(f"recorded {len(prompts)} instructions -> {recording_path}", file=sys.stderr)
+        return 0
+
+    client = ReplayClient(load_recording(recording_path), token_ms=args.token_ms)
+    with contextlib.redirect_stdout(sys.stderr):    # keep stdout for the report
+        report = replay(prompts, client, params, args.repeat, not args.no_export, args.trace_memory)
+    text = json.dumps(report, indent=2, default=float)
+    if args.out:
+        args.out.write_text(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
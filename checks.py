@@ -0,0 +1,116 @@
+"""Per-span code checks: deflection limits and span/depth ratios.
+
+Works on the node displacement array of a solved model (local solver or
+RFEM, see ``fea.displacements``) and the spans between the supports laid
+down by ``generate_supports``. Everything is computed for all spans at
+once; the results are plain dicts so they can go straight into the
+assistant's state instead of the model doing the arithmetic.
+
+The limits are the usual project defaults, not a substitute for the
+governing code clauses:
+
+- AASHTO LRFD 2.5.2.6: live-load deflection L/800; steel composite
+  I-girder overall depth 0.040 L (simple) / 0.032 L (continuous).
+- EC (EN 1990 A2 / EN 1994-2 practice): deflection L/500; span/depth
+  25 (simple) / 30 (continuous).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from objects import FEAModel, span_ranges
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    name: str
+    deflection_ratio: float          # limit = span / deflection_ratio
+    span_depth_simple: float         # max span/depth, single span
+    span_depth_continuous: float     # max span/depth, continuous spans
+
+
+RULE_SETS = {
+    "EC": RuleSet("EC", deflection_ratio=500, span_depth_simple=25, span_depth_continuous=30),
+    "AASHTO": RuleSet("AASHTO", deflection_ratio=800, span_depth_simple=25, span_depth_continuous=31.25),
+}
+
+
+def span_deflections(fea: FEAModel, spans=None, component: int = 2) -> np.ndarray:
+    """Largest |displacement ``component``| (2 = vertical) of the nodes in each span."""
+    spans = span_ranges(fea) if spans is None else spans
+    out = np.zeros(len(spans))
+    if fea.displacements is None or not spans:
+        return out
+    breaks = np.array([a for a, _ in spans] + [spans[-1][1]])
+    x = fea.coords[:, 0]
+    span = np.searchsorted(breaks, x, side="right") - 1
+    inside = (span >= 0) & (span < len(spans)) | (np.abs(x - breaks[-1]) <= fea.tol)
+    span = np.clip(span, 0, len(spans) - 1)
+    u = np.abs(fea.displacements[:, component])
+    ok = inside & np.isfinite(u)
+    np.maximum.at(out, span[ok], u[ok])
+    return out
+
+
+def girder_depth(fea: FEAModel) -> float:
+    """Overall depth of the girders (bottom flange to deck level)."""
+    z = fea.coords[:, 2]
+    return float(z.max() - z.min()) if len(z) else 0.0
+
+
+def check_spans(fea: FEAModel, rule_set: str = "EC", depth: float = None) -> dict:
+    """Deflection and span/depth checks of every span against one rule set.
+
+    Returns ``{"rule_set", "ok", "spans": [...]}`` with per span its
+    start/end, length, max vertical deflection, limit and utilisation
+    (deflection / limit; > 1 fails), and the span/depth ratio with its
+    limit and utilisation.
+    """
+    rules = RULE_SETS[rule_set]
+    spans = span_ranges(fea)
+    if not spans:
+        return {"rule_set": rule_set, "ok": None, "spans": []}
+    start, end = np.array(spans).T
+    length = end - start
+    depth = girder_depth(fea) if depth is None else depth
+
+    solved = fea.displacements is not None
+    deflection = span_deflections(fea, spans)
+    limit = length / rules.deflection_ratio
+    deflection_util = deflection / limit
+
+    continuous = len(spans) > 1
+    span_depth_limit = rules.span_depth_continuous if continuous else rules.span_depth_simple
+    span_depth = length / depth if depth > 0 else np.full(len(spans), np.inf)
+    span_depth_util = span_depth / span_depth_limit
+
+    ok = (span_depth_util <= 1) & ((deflection_util <= 1) if solved else True)
+    rows = []
+    for i in range(len(spans)):
+        row = {
+            "span": i + 1,
+            "start": _round(start[i]), "end": _round(end[i]), "length": _round(length[i]),
+            "span_depth": _round(span_depth[i]), "span_depth_limit": span_depth_limit,
+            "span_depth_utilisation": _round(span_depth_util[i]),
+        }
+        if solved:
+            row.update(max_deflection=_round(deflection[i]), deflection_limit=_round(limit[i]),
+                       deflection_limit_rule=f"L/{rules.deflection_ratio:g}",
+                       deflection_utilisation=_round(deflection_util[i]))
+        row["ok"] = bool(ok[i])
+        rows.append(row)
+    return {"rule_set": rule_set, "ok": bool(ok.all()), "spans": rows}
+
+
+def check_model(fea: FEAModel, rule_sets=tuple(RULE_SETS), depth: float = None) -> dict[str, dict]:
+    """``check_spans`` for several rule sets, keyed by rule set name."""
+    return {name: check_spans(fea, name, depth) for name in rule_sets}
+
+
+def _round(value: float, digits: int = 4):
+    """Round to ``digits`` significant figures (keeps the assistant's prompt short)."""
+    value = float(value)
+    if not np.isfinite(value) or value == 0:
+        return value
+    return float(f"{value:.{digits}g}")
+
@@ -1,6 +1,31 @@
+"""API keys from ``config.json`` in the working directory.
+
+The file is read on first use, not at import, so modules that only
+sometimes need a key stay cheap to import and work without the file::
+
+    import config
+    config.get("RFEM_API_KEY")
+    from config import RFEM_KEY     # also fine, reads the file at this point
+"""
 import json
-with open("config.json") as f:
-    config = json.load(f)
+from functools import lru_cache
+
+CONFIG_PATH = "config.json"
+
+_ALIASES = {"OPENAI_KEY": "OPENAI_API_KEY", "RFEM_KEY": "RFEM_API_KEY"}
+
+
+@lru_cache(maxsize=None)
+def load() -> dict:
+    with open(CONFIG_PATH) as f:
+        return json.load(f)
+
+
+def get(name: str):
+    return load()[name]
+
 
-OPENAI_KEY = config["OPENAI_API_KEY"]
-RFEM_KEY = config["RFEM_API_KEY"]
+def __getattr__(name):
+    if name in _ALIASES:
+        return get(_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
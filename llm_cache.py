@@ -0,0 +1,154 @@
+"""Persistent cache of assistant completions, with in-flight deduplication.
+
+The assistant runs at ``temperature=0``, so the same model, system prompt,
+instruction, model state and conversation history give the same answer.
+``request_key`` hashes those (whitespace-normalised) and ``LLMCache``
+keeps the raw completion text in a small SQLite file. Entries expire
+after ``ttl`` seconds, and the least recently used ones are dropped
+beyond ``max_entries``. Identical requests made while one is still
+running wait for it instead of calling the API again.
+
+With ``BRIDGE_LLM_OFFLINE=1`` a miss raises instead of going to the
+network, so scripted sessions can be replayed entirely from the cache.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+CACHE_PATH = Path(os.environ.get("BRIDGE_LLM_CACHE",
+                                 Path.home() / ".cache" / "rfem-bridge-demo" / "llm.sqlite3"))
+TTL = 30 * 24 * 3600.0
+MAX_ENTRIES = 5000
+OFFLINE = os.environ.get("BRIDGE_LLM_OFFLINE", "") not in ("", "0")
+
+_KEY_VERSION = "llm-v1"
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a request has no cached answer."""
+
+
+def _norm(text) -> str:
+    return " ".join(str(text).split())
+
+
+def request_key(model: str, system: str, prompt: str, state: dict, history=(), **options) -> str:
+    """Hash of everything that determines a completion.
+
+    ``history`` is the earlier (instruction, answer) texts sent along;
+    ``options`` are the remaining API arguments (temperature, ...).
+    """
+    payload = {
+        "v": _KEY_VERSION, "model": model, "system": _norm(system), "prompt": _norm(prompt),
+        "state": state, "history": [_norm(h) for h in history], "options": options,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path=CACHE_PATH, ttl: float = TTL, max_entries: int = MAX_ENTRIES, offline: bool = OFFLINE):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._inflight: dict[str, Future] = {}
+        self._db = None
+
+    def _conn(self) -> sqlite3.Connection:
+        # callers hold self._lock; one connection shared by the worker threads
+        if self._db is None:
+            if str(self.path) != ":memory:":
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS completions ("
+                             "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL, used REAL)")
+        return self._db
+
+    def get(self, key: str) -> str | None:
+        """Cached response for ``key`` if present and not expired."""
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT response, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            with db:
+                db.execute("UPDATE completions SET used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.execute("INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)", (key, response, now, now))
+                self._evict(db, now)
+
+    def _evict(self, db, now: float):
+        db.execute("DELETE FROM completions WHERE created < ?", (now - self.ttl,))
+        db.execute("DELETE FROM completions WHERE key NOT IN "
+                   "(SELECT key FROM completions ORDER BY used DESC LIMIT ?)", (self.max_entries,))
+
+    def complete(self, key: str, fetch) -> str:
+        """Cached response for ``key``, else ``fetch()`` (once, however many threads ask)."""
+        with self._lock:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+        if not owner:
+            return fut.result()
+        try:
+            if self.offline:
+                raise CacheMiss(f"no cached answer for this request (offline mode, key {key[:12]})")
+            response = fetch()
+            self.put(key, response)
+            fut.set_result(response)
+            return response
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def clear(self):
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.execute("DELETE FROM completions")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_cache: LLMCache = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide cache at ``CACHE_PATH`` (override with ``set_llm_cache``)."""
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
+
+
+def set_llm_cache(cache: LLMCache):
+    global _cache
+    _cache = cache
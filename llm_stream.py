@@ -0,0 +1,139 @@
+"""Incremental parsing of the assistant's streamed JSON answer.
+
+The assistant answers with one JSON object, either ``{"message": ...}``
+or parameter updates. ``JsonStreamParser`` is fed the completion chunk
+by chunk. It reports each top-level key as soon as its value is complete
+(``on_field(key, value)``), and the text of the ``message`` string while
+it is still arriving (``on_text(delta)``). Text around the object, such
+as a Markdown code fence, is ignored. ``close`` returns the whole object
+and falls back to parsing the full text if the stream was not a clean
+object.
+"""
+import json
+import re
+
+_PARTIAL_ESCAPE = re.compile(r"(?<!\\)(\\\\)*\\(u[0-9a-fA-F]{0,3})?$")
+
+
+class JsonStreamParser:
+    def __init__(self, on_field=None, on_text=None, text_key: str = "message"):
+        self.on_field = on_field
+        self.on_text = on_text
+        self.text_key = text_key
+        self.fields = {}
+        self.failed = False
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._state = "start"   # start, key, colon, value, in_value, done
+        self._key = None
+        self._key_start = 0
+        self._value_start = 0
+        self._sent = 0           # characters of the text value already reported
+
+    def feed(self, chunk: str):
+        if not chunk or self.failed or self._state == "done":
+            self._buf += chunk or ""
+            return
+        self._buf += chunk
+        buf = self._buf
+        for i in range(self._pos, len(buf)):
+            if self._step(buf, i, buf[i]) is False:
+                break
+        self._pos = len(buf)
+        self._stream_text()
+
+    def _step(self, buf: str, i: int, ch: str):
+        if self._in_str:
+            if self._esc:
+                self._esc = False
+            elif ch == "\\":
+                self._esc = True
+            elif ch == '"':
+                self._in_str = False
+                if self._depth == 1 and self._state == "key":
+                    self._key = json.loads(buf[self._key_start:i + 1])
+                    self._state = "colon"
+            return
+        if self._state == "start":
+            if ch == "{":
+                self._depth, self._state = 1, "key"
+            return
+        if ch.isspace():
+            return
+        top = self._depth == 1
+        if top and self._state == "value":
+            self._value_start, self._state = i, "in_value"
+        if ch == '"':
+            self._in_str = True
+            if top and self._state == "key":
+                self._key_start = i
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self._end_value(buf, i)
+                self._state = "done"
+                return False
+        elif top and ch == ",":
+            self._end_value(buf, i)
+            self._state = "key"
+        elif top and ch == ":" and self._state == "colon":
+            self._state = "value"
+
+    def _end_value(self, buf: str, end: int):
+        if self._state != "in_value":
+            return
+        try:
+            value = json.loads(buf[self._value_start:end])
+        except json.JSONDecodeError:
+            self.failed = True
+            return
+        if self._key == self.text_key and isinstance(value, str) and self.on_text is not None \
+                and len(value) > self._sent:
+            self.on_text(value[self._sent:])
+        self._sent = 0
+        self.fields[self._key] = value
+        if self.on_field is not None:
+            self.on_field(self._key, value)
+
+    def _stream_text(self):
+        """Report the new part of a ``text_key`` string that is still open."""
+        if not (self._in_str and self._depth == 1 and self._state == "in_value"
+                and self._key == self.text_key and self.on_text is not None):
+            return
+        raw = self._buf[self._value_start + 1:]
+        partial = _PARTIAL_ESCAPE.search(raw)     # cut an escape sequence split across chunks
+        if partial:
+            raw = raw[:partial.start()]
+        try:
+            text = json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            return
+        if text and "\ud800" <= text[-1] <= "\udbff":
+            text = text[:-1]      # first half of a \uXXXX\uXXXX surrogate pair
+        if len(text) > self._sent:
+            self.on_text(text[self._sent:])
+            self._sent = len(text)
+
+    @property
+    def complete(self) -> bool:
+        return self._state == "done" and not self.failed
+
+    @property
+    def text(self) -> str:
+        return self._buf
+
+    def close(self) -> dict:
+        """The parsed object; raises ``ValueError`` if the answer is not a JSON object."""
+        if self.complete:
+            return self.fields
+        start, end = self._buf.find("{"), self._buf.rfind("}")
+        obj = json.loads(self._buf[start:end + 1] if 0 <= start < end else self._buf)
+        if not isinstance(obj, dict):
+            raise ValueError(f"expected a JSON object, got {type(obj).__name__}")
+        return obj
+
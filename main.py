@@ -1,26 +1,44 @@
-import json
 import tkinter as tk
-from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import Axes3D  # import required once at top
-from openai import OpenAI
+from tkinter import filedialog, ttk
 
-from config import OPENAI_KEY
-from rfem_conn import fea_to_rfem
-from objects import CrossFrame, Deck, Girder, FEAModel, generate_stations, generate_supports
+# matplotlib, openai, scipy and dlubal load on first use (see benchmarks/bench_startup.py)
+from objects import FEAModel, build_fea, span_ranges
+from regen import BridgeModel, Changeset
+from tasks import TaskScheduler
+from llm_stream import JsonStreamParser
+import assistant
+import metrics
+import model_io
 
 
 
-api_key = OPENAI_KEY
-client = OpenAI(api_key=api_key)  # assumes OPENAI_API_KEY in environment
+_client = None
+
+
+def openai_client():
+    """The OpenAI client, created on the first chat request."""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        from config import OPENAI_KEY
+        _client = OpenAI(api_key=OPENAI_KEY)
+    return _client
+
 
 class BridgeUI:
     def __init__(self, root):
         self.root = root
         root.title("Parametric Bridge Generator")
         self.last_fea = None   # holds last generated FEAModel
+        self.model: BridgeModel = None          # last_fea plus the parameters behind it
+        self._unexported = Changeset(rebuilt=True)   # changes since the last RFEM export
+        self._fea_readers: set[int] = set()    # background tasks still reading last_fea
+        self._metrics_window = None
+
+        # meshing, RFEM and OpenAI calls run in the background
+        self.tasks = TaskScheduler(root)
+        self._task_bubbles: dict[int, tk.Label] = {}
+        root.protocol("WM_DELETE_WINDOW", self.close)
 
         # Parameters
         self.num_spans = tk.IntVar(value=1)
@@ -36,9 +54,16 @@ class BridgeUI:
         self.deck_thickness = tk.DoubleVar(value=0.25)
         self.overhang = tk.DoubleVar(value=0.5)
         self.mesh_size = tk.DoubleVar(value=2.5)
+        # graded mesh: 0 = uniform mesh_size / no element cap
+        self.min_mesh_size = tk.DoubleVar(value=0.0)
+        self.element_budget = tk.IntVar(value=0)
         self.crossframe_spacing = tk.DoubleVar(value=5.0)
         self.flange_width = tk.DoubleVar(value=0.5)
         self.flange_thickness = tk.DoubleVar(value=0.05)
+
+        # preview level of detail; "detail span" 0 = none, else that span in full
+        self.lod = tk.StringVar(value="auto")
+        self.detail_span = tk.IntVar(value=0)
         
         
         self.frm_left = ttk.Frame(self.root)
@@ -64,7 +89,9 @@ class BridgeUI:
         # UI layout
         self._build_form()
         self._build_chat()
-        self._build_canvas()
+        # the figure (and matplotlib) once the window is up
+        self.canvas = None
+        root.after_idle(self._build_canvas)
         self.last_prompt = None
         self.last_answer = None
 
@@ -87,12 +114,15 @@ class BridgeUI:
             ("Deck thickness", self.deck_thickness),
             ("Overhang", self.overhang),
             ("Mesh size", self.mesh_size),
+            ("Min mesh size (0 = uniform)", self.min_mesh_size),
+            ("Element budget (0 = none)", self.element_budget),
             ("Cross-frame spacing", self.crossframe_spacing),
         ]
 
         for i,(label,var) in enumerate(self.fields, start=self.row_offset):
             ttk.Label(self.frm_left, text=label).grid(row=i, column=0, sticky="w")
             tk.Entry(self.frm_left, textvariable=var).grid(row=i, column=1)
+            var.trace_add("write", self._on_param_change)
 
         ttk.Button(self.frm_left, text="Generate", command=self.generate_bridge).grid(
             row=self.row_offset+len(self.fields), column=0, columnspan=2, pady=5
@@ -101,6 +131,93 @@ class BridgeUI:
         ttk.Button(self.frm_left, text="Export to RFEM", command=self.export_to_rfem).grid(
         row=self.row_offset+len(self.fields)+1, column=0, columnspan=2, pady=5
         )
+
+        ttk.Button(self.frm_left, text="Preview analysis", command=self.preview_analysis).grid(
+        row=self.row_offset+len(self.fields)+2, column=0, columnspan=2, pady=5
+        )
+
+        row = self.row_offset+len(self.fields)+3
+        ttk.Label(self.frm_left, text="Detail").grid(row=row, column=0, sticky="w")
+        lod_box = ttk.Combobox(self.frm_left, textvariable=self.lod, values=("auto", "coarse", "full"),
+                               state="readonly", width=8)
+        lod_box.grid(row=row, column=1, sticky="w")
+        lod_box.bind("<<ComboboxSelected>>", lambda e: self.redraw())
+        ttk.Label(self.frm_left, text="Detail span (0 = none)").grid(row=row+1, column=0, sticky="w")
+        span_box = tk.Spinbox(self.frm_left, from_=0, to=99, textvariable=self.detail_span, width=6,
+                              command=self.redraw)
+        span_box.grid(row=row+1, column=1, sticky="w")
+        span_box.bind("<Return>", lambda e: self.redraw())
+
+        files = tk.Frame(self.frm_left)
+        files.grid(row=row+2, column=0, columnspan=2, pady=5)
+        ttk.Button(files, text="Open model", command=self.open_model).pack(side="left", padx=2)
+        ttk.Button(files, text="Save model", command=self.save_model).pack(side="left", padx=2)
+
+        ttk.Button(self.frm_left, text="Metrics", command=self.show_metrics).grid(
+        row=row+3, column=0, columnspan=2, pady=5
+        )
+
+    def save_model(self):
+        if self.model is None:
+            self.add_chat_message("System", "⚠️ Please generate the bridge first before saving.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=model_io.SUFFIX,
+                                            filetypes=[("Bridge model", f"*{model_io.SUFFIX}")])
+        if not path:
+            return
+        try:
+            model_io.save_model(path, self.model.fea, self.model.params)
+        except OSError as e:
+            self.add_chat_message("System", f"⚠️ Could not save model: {e}")
+            return
+        self.add_chat_message("Task", f"Model saved to {path}")
+
+    def open_model(self):
+        path = filedialog.askopenfilename(filetypes=[("Bridge model", f"*{model_io.SUFFIX}")])
+        if not path:
+            return
+        try:
+            fea, params = model_io.load_model(path)
+        except (OSError, model_io.ModelFormatError) as e:
+            self.add_chat_message("System", f"⚠️ Could not open model: {e}")
+            return
+        if params is None:
+            self.add_chat_message("System", "⚠️ The file has no bridge parameters.")
+            return
+        # the form shows the saved parameters; the model is used as loaded, not regenerated
+        self.update_from_dict(params)
+        self.tasks.cancel("generate")
+        self._show_model(BridgeModel(params, fea))
+
+    def show_metrics(self):
+        """Live span/counter table; opening it switches metrics collection on."""
+        if not metrics.enabled:
+            metrics.enable()
+        if self._metrics_window is not None and self._metrics_window.winfo_exists():
+            self._metrics_window.lift()
+            return
+        win = self._metrics_window = tk.Toplevel(self.root)
+        win.title("Metrics")
+        text = tk.Text(win, width=70, height=24, font=("Courier", 9))
+        text.pack(fill="both", expand=True)
+        buttons = tk.Frame(win)
+        buttons.pack(fill="x")
+        ttk.Button(buttons, text="Save Chrome trace", command=self._save_trace).pack(side="left", padx=5, pady=5)
+        ttk.Button(buttons, text="Reset", command=metrics.registry.reset).pack(side="left", pady=5)
+
+        def refresh():
+            if not win.winfo_exists():
+                return
+            text.delete("1.0", "end")
+            text.insert("1.0", metrics.format_snapshot())
+            win.after(1000, refresh)
+        refresh()
+
+    def _save_trace(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome trace", "*.json")])
+        if path:
+            metrics.export_chrome_trace(path)
+            self.add_chat_message("Task", f"Trace saved to {path} (open in chrome://tracing or Perfetto)")
         
     def _build_chat(self):
         # --- thin separator above chat ---
@@ -157,6 +274,9 @@ class BridgeUI:
         elif sender == "LLM":
             side = "left"
             bg = "#ECECEC"
+        elif sender == "Task":
+            side = "left"
+            bg = "#E3ECF7"
         else:
             side = "left"
             bg = "#FFD2D2"
@@ -182,20 +302,72 @@ class BridgeUI:
         # scroll to bottom
         self.chat_canvas.update_idletasks()
         self.chat_canvas.yview_moveto(1)
+        return bubble
+
+    def _task_status(self, task, text):
+        """One chat bubble per background task, updated in place."""
+        msg = f"{task.name}: {text}"
+        bubble = self._task_bubbles.get(task.id)
+        if bubble is None:
+            self._task_bubbles[task.id] = self.add_chat_message("Task", msg)
+        else:
+            bubble.config(text=msg)
+        if text == "cancelled" or text.startswith(("done", "failed")):
+            self._task_bubbles.pop(task.id, None)
+            self._fea_readers.discard(task.id)
+
+    def _on_param_change(self, *args):
+        # a generation started from the old values is stale now
+        self.tasks.cancel("generate")
+
+    def close(self):
+        self.tasks.shutdown()
+        self.root.destroy()
 
 
 
                 
     def export_to_rfem(self):
         if self.last_fea is None:
-            print("⚠️ Please generate the bridge first before exporting.")
+            self.add_chat_message("System", "⚠️ Please generate the bridge first before exporting.")
             return
-        try:
-            fea_to_rfem(self.last_fea, model_name="BridgeParametric")
-            print("✅ Export successful, check RFEM.")
-        except Exception as e:
-            print(f"❌ Export failed: {e}")
-            
+        fea, model_name = self.last_fea, "BridgeParametric"
+        changes, self._unexported = self._unexported, Changeset()
+
+        def failed(exc):
+            # nothing (or not all) reached RFEM: these changes are still unexported
+            self._unexported = changes.merge(self._unexported)
+
+        def export(task):
+            from rfem_conn import fea_to_rfem    # dlubal.api loads in the worker
+            fea_to_rfem(fea, model_name=model_name, cancel=task.cancel, changes=changes,
+                        progress=lambda done, total, stage: task.report(f"{stage} {done}/{total}"))
+            return fea
+
+        # one export per RFEM model at a time; a second click waits its turn
+        task = self.tasks.submit("Export to RFEM", export, on_status=self._task_status,
+                                 on_done=self._show_deflection, on_error=failed,
+                                 exclusive=f"rfem:{model_name}")
+        self._fea_readers.add(task.id)
+
+    def preview_analysis(self):
+        if self.last_fea is None:
+            self.add_chat_message("System", "⚠️ Please generate the bridge first before running the preview.")
+            return
+        fea = self.last_fea
+
+        def solve(task):
+            from solver import solve_linear_static
+            solve_linear_static(fea)
+            return fea
+
+        task = self.tasks.submit("Preview analysis", solve, on_status=self._task_status,
+                                 on_done=self._show_deflection, supersede="preview")
+        self._fea_readers.add(task.id)
+
+    def _show_deflection(self, fea):
+        self.add_chat_message("Task", f"Max deflection {fea.max_deflection:.4g}")
+
     def update_span_fields(self):
         """Rebuilds entry fields for span lengths based on num_spans."""
         for widget in self.span_frame.winfo_children():
@@ -205,6 +377,7 @@ class BridgeUI:
         for i in range(self.num_spans.get()):
             var = tk.DoubleVar(value=30.0)  # default span length
             self.span_lengths.append(var)
+            var.trace_add("write", self._on_param_change)
             ttk.Label(self.span_frame, text=f"Span {i+1} length").grid(row=i, column=0, sticky="w")
             tk.Entry(self.span_frame, textvariable=var).grid(row=i, column=1)
 
@@ -222,11 +395,14 @@ class BridgeUI:
             "number_of_girders": self.num_girders,
             "girder_spacing": self.girder_spacing,
             "girder_depth": self.girder_depth,
+            "web_thickness": self.web_thickness,
             "flange_width": self.flange_width,
             "flange_thickness": self.flange_thickness,
             "deck_thickness": self.deck_thickness,
             "overhang": self.overhang,
             "mesh_size": self.mesh_size,
+            "min_mesh_size": self.min_mesh_size,
+            "element_budget": self.element_budget,
             "crossframe_spacing": self.crossframe_spacing,
         }
         for key, var in mapping.items():
@@ -234,26 +410,24 @@ class BridgeUI:
                 var.set(params[key])
 
     
-    def to_llm_dict(self):
-        data = {
+    def params(self) -> dict:
+        """Snapshot of the form as plain values, the input of ``objects.build_fea``."""
+        return {
             "span_lengths": [var.get() for var in self.span_lengths],
             "number_of_girders": self.num_girders.get(),
             "girder_spacing": self.girder_spacing.get(),
             "girder_depth": self.girder_depth.get(),
+            "web_thickness": self.web_thickness.get(),
             "flange_width": self.flange_width.get(),
             "flange_thickness": self.flange_thickness.get(),
             "deck_thickness": self.deck_thickness.get(),
             "overhang": self.overhang.get(),
             "mesh_size": self.mesh_size.get(),
+            "min_mesh_size": self.min_mesh_size.get(),
+            "element_budget": self.element_budget.get(),
             "crossframe_spacing": self.crossframe_spacing.get(),
         }
 
-        # include analysis results only if available
-        if getattr(self.last_fea, "max_deflection", None) is not None:
-            data["max_deflection"] = float(self.last_fea.max_deflection)
-
-        return data
-
     
     
     
@@ -273,7 +447,11 @@ class BridgeUI:
     
 
     def _build_canvas(self):
-        self.fig = plt.figure(figsize=(6,4))
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (registers the 3d projection)
+
+        self.fig = Figure(figsize=(6,4))
         self.ax = self.fig.add_subplot(111, projection="3d")
         ax = self.ax
                 # --- cleanup view ---
@@ -284,66 +462,50 @@ class BridgeUI:
         ax.set_zticks([])
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.canvas_frame)
         self.canvas.get_tk_widget().pack(side="right", fill="both", expand=True)
+        self.redraw()
         
     def generate_bridge(self):
-        fea = FEAModel()
-
-        # Collect span lengths
-        span_lengths = [var.get() for var in self.span_lengths]
-        total_length = sum(span_lengths)
-
-        mesh_size = self.mesh_size.get()
-        cross_spacing = self.crossframe_spacing.get()
-
-        fea.flange_thickness = self.flange_thickness.get()
-        fea.flange_width = self.flange_width.get()
-
-        # Cross-frame positions (for each span)
-        crossframes = []
-        x0 = 0
-        for L in span_lengths:
-            n_frames = int(L / cross_spacing)
-            crossframes += [x0 + i*cross_spacing for i in range(1, n_frames)]
-            x0 += L
-
-        stations = generate_stations(0, total_length, crossframes, mesh_size)
-
-        # Girders
-        girders = [
-            Girder(
-                id=i,
-                depth=self.girder_depth.get(),
-                flange_width=self.flange_width.get(),
-                flange_thickness=self.flange_thickness.get(),
-                web_thickness=self.web_thickness.get(),
-                x=i*self.girder_spacing.get()
-            )
-            for i in range(self.num_girders.get())
-        ]
-        for g in girders:
-            g.generate_fea(fea, stations)
-        
-        
-        cfs = [
-            CrossFrame(cf_id, sta, "K", g1=girders[gi-1], g2=girders[gi])
-            for gi in range(1, len(girders))
-            for cf_id, sta in enumerate(crossframes, start=1)
-        ]
+        # Tk variables are read here, on the main thread; the worker only sees plain values
+        params = self.params()
+        invalid = assistant.invalid_parameters(params)
+        if invalid:
+            self.add_chat_message("System", "⚠️ " + "; ".join(f"{k} {reason}" for k, reason in invalid.items()))
+            return
+        model = self.model
+        if model is not None and "topology" not in model.effects(params):
+            # thickness/section/geometry edits: update the model in place, no remesh
+            self.tasks.cancel("generate")
+            if self._fea_readers:
+                model.fea = model.fea.copy()    # an export or preview still reads the old one
+            self._apply_changes(model.update(params))
+            return
+        self.tasks.submit("Generate", lambda task: BridgeModel(params, build_fea(params, task.cancel)),
+                          on_status=self._task_status, on_done=self._show_model, supersede="generate")
 
-        for cf in cfs:
-            cf.generate_fea(fea)
-            
-        # Supports
-        generate_supports(fea, girders, span_lengths, support_type="pinned")
+    def _show_model(self, model):
+        self.model = model
+        self._apply_changes(Changeset(set(model.params), rebuilt=True))
 
-        # Deck
-        deck = Deck(self.deck_thickness.get(), self.overhang.get())
-        deck.generate_fea(fea, girders, 0, total_length, crossframes, mesh_size)
-        self.last_fea = fea
+    def _apply_changes(self, changes: Changeset):
+        self.last_fea = self.model.fea
+        self._unexported = self._unexported.merge(changes)
+        if changes.redraw:
+            self.redraw()
+
+    def redraw(self):
+        if self.last_fea is None or self.canvas is None:
+            return
+        from render import draw_3d
+        spans = span_ranges(self.last_fea)
+        try:
+            i = self.detail_span.get()
+        except tk.TclError:
+            i = 0
+        span = spans[i - 1] if 1 <= i <= len(spans) else None
         # Draw 3D
-        draw_3d(fea, self.ax)
-        self.canvas.draw()
-    
+        draw_3d(self.last_fea, self.ax, lod=self.lod.get(), span=span)
+        with metrics.span("render.canvas"):
+            self.canvas.draw()
 
     def run_llm_command(self):
         prompt = self.chat_entry.get().strip()
@@ -352,141 +514,65 @@ class BridgeUI:
         self.chat_entry.delete(0, "end")
 
         # show user message
-
-        # call LLM
-        state = self.to_llm_dict()
-        self.add_chat_message("You", prompt,state)
-
-        if self.last_prompt and self.last_answer:
-            context = (
-                f"Previous user instruction: {self.last_prompt}\n"
-                f"Previous assistant answer: {self.last_answer}\n"
-                f"New instruction: {prompt}\n"
-                f"Current state: {state}"
-            )
+        self.add_chat_message("You", prompt)
+
+        # the model asks for parameters, results and checks through tools (assistant.TOOLS)
+        params, model = self.params(), self.model
+        history = (self.last_prompt, self.last_answer) if self.last_prompt and self.last_answer else ()
+        reply = {"bubble": None, "text": ""}
+
+        def ask(task):
+            # message text and parameter values reach the UI while the answer streams in
+            parser = JsonStreamParser(on_field=lambda k, v: task.post(self._llm_field, k, v),
+                                      on_text=lambda delta: task.post(self._llm_text, reply, delta))
+            answer, changes = assistant.ask(openai_client(), prompt, params, model, history, parser,
+                                            on_change=lambda c: task.post(self.update_from_dict, c),
+                                            check=task.check)
+            return answer, changes, parser
+
+        task = self.tasks.submit("Assistant", ask, on_status=self._task_status,
+                                 on_done=lambda result: self._apply_llm_answer(prompt, reply, *result))
+        self._fea_readers.add(task.id)
+
+    def _llm_text(self, reply, delta):
+        reply["text"] += delta
+        if reply["bubble"] is None:
+            reply["bubble"] = self.add_chat_message("LLM", reply["text"])
         else:
-            context = f"Current state: {state}\nInstruction: {prompt}"
-            
-            
-        
-        system_prompt = """
-        You are an assistant for parametric bridge modeling.
-        
-        The engineer gives instructions in natural language.
-        You always respond with a JSON object.
-        
-        - All units are in feet. Do NOT convert to meters or any other system.
-        
-        - If the instruction changes the model, output updates using keys:
-          {span_lengths, number_of_girders, girder_spacing, girder_depth, flange_width, flange_thickness,
-           deck_thickness, overhang, mesh_size, crossframe_spacing}
-        
-        - If the instruction is a knowledge query (about Eurocode, AASHTO, analysis results, etc.),
-          return a JSON object with a single key:
-          {"message": "<your answer here>"}
-        
-        - If the user explicitly asks about analysis results (e.g. "check deflection", "is the force OK"),
-          then use the provided results (e.g. max_deflection, forces, stresses).
-          Compare against common code limits (e.g. L/800 for deflection).
-          If values exceed the limit, provide corrective suggestions, such as:
-            - Increase girder depth
-            - Add more girders
-            - Reduce span length
-            - Adjust cross-frame spacing
-          Include these suggestions in the message.
-        
-        Never return free text outside JSON. Always return valid JSON only.
-        """
-
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", 
-                 "content": system_prompt},
-                {"role": "user", "content": context}
-            ],
-            temperature=0
-        )
-        raw = response.choices[0].message.content
-        
+            reply["bubble"].config(text=reply["text"])
+            self.chat_canvas.yview_moveto(1)
+
+    def _llm_field(self, key, value):
+        if key != "message":
+            self.update_from_dict({key: value})
+
+    def _apply_llm_answer(self, prompt, reply, raw, changes, parser):
         # store last prompt/answer
         self.last_prompt = prompt
         self.last_answer = raw
+        # parameters changed through set_parameters are in the form already
+        regenerate = bool(changes)
                 
         try:
-            update = json.loads(raw)
+            # fields seen so far are already applied; an unclean stream is parsed as a whole
+            update = parser.close()
             if "message" in update:
                 # show LLM answer in chat only
-                self.add_chat_message("LLM", update["message"])
+                if reply["bubble"] is None:
+                    self.add_chat_message("LLM", update["message"])
+                else:
+                    reply["bubble"].config(text=update["message"])
             else:
                 # apply model update
                 self.add_chat_message("LLM", raw)
                 self.update_from_dict(update)
-                self.generate_bridge()
+                regenerate = True
         except Exception as e:
             self.add_chat_message("System", f"⚠️ Could not parse: {e}")
+        if regenerate:
+            self.generate_bridge()
         
         
-def draw_3d(fea: FEAModel, ax):
-    ax.clear()
-    # existing lines + surfaces + nodes …
-    for s in fea.supports:
-        for nid in s.node_ids:
-            n = next(n for n in fea.nodes.values() if n.id == nid)
-            ax.scatter([n.x], [n.y], [n.z], color="green", s=50, marker="^")  # green triangles
-            
-            
-    # Draw lines (beams, cross-frames)
-    for line in fea.lines:
-        n1 = next(n for n in fea.nodes.values() if n.id==line.node_start)
-        n2 = next(n for n in fea.nodes.values() if n.id==line.node_end)
-        ax.plot([n1.x, n2.x], [n1.y, n2.y], [n1.z, n2.z], "k-")
-
-    # Draw surfaces (deck, webs)
-    for surf in fea.surfaces:
-        nodes = [next(n for n in fea.nodes.values() if n.id==nid) for nid in [surf.node_1, surf.node_2, surf.node_3, surf.node_4]]
-        verts = [[(n.x, n.y, n.z) for n in nodes]]
-        ax.add_collection3d(Poly3DCollection(verts, alpha=0.3, facecolor="lightblue"))
-
-    xs, ys, zs = zip(*[(n.x, n.y, n.z) for n in fea.nodes.values()])
-    ax.scatter(xs, ys, zs, color="red", s=10)   # s=point size
-    set_equal_3d(ax, xs, ys, zs)
-
-    # # Axes labels & view
-    # ax.set_xlabel("X (length)")
-    # ax.set_ylabel("Y (transverse)")
-    # ax.set_zlabel("Z (depth)")
-    # ax.view_init(elev=20, azim=-60)
-    
-    
-        # --- cleanup view ---
-    ax.set_axis_off()        # hides all axes, ticks, labels
-    ax.grid(False)           # no grid
-    ax.set_xticks([])
-    ax.set_yticks([])
-    ax.set_zticks([])
-    ax.set_axis_off()
-    ax.margins(0)                # remove margins
-    ax.figure.tight_layout()     # tight layout for full fit
-    ax.figure.subplots_adjust(left=0, right=1, top=1, bottom=0)  # full bleed
-    ax.set_title("FEA Placeholder View (3D)")
-
-def set_equal_3d(ax, X, Y, Z):
-    """Force equal aspect ratio in 3D plots."""
-    max_range = max(
-        max(X)-min(X),
-        max(Y)-min(Y),
-        max(Z)-min(Z)
-    ) / 2.0
-    mid_x = (max(X)+min(X)) * 0.5
-    mid_y = (max(Y)+min(Y)) * 0.5
-    mid_z = (max(Z)+min(Z)) * 0.5
-    ax.set_xlim(mid_x - max_range, mid_x + max_range)
-    ax.set_ylim(mid_y - max_range, mid_y + max_range)
-    ax.set_zlim(mid_z - max_range, mid_z + max_range)
-              
-    
-
 if __name__ == "__main__":
     root = tk.Tk()
     app = BridgeUI(root)
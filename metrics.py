@@ -0,0 +1,203 @@
+"""Timing spans and counters for the hot paths (generate, render, export, chat).
+
+Off by default: ``span`` then returns a shared no-op context manager and
+``count`` returns right away, so instrumented code pays about one
+function call. Switch on with ``BRIDGE_METRICS=1`` (trace file
+``BRIDGE_METRICS_TRACE``, default ``~/.cache/rfem-bridge-demo/trace.jsonl``)
+or ``enable()``.
+
+While enabled, the registry keeps:
+
+- per span name: count, total, max seconds;
+- counters (nodes/lines/surfaces created, objects sent, bytes received,
+  tokens used, ...);
+- the last ``MAX_EVENTS`` span events, exported as a Chrome trace
+  (``chrome://tracing`` / Perfetto) by ``export_chrome_trace``;
+- one JSON line per span and counter update in a rotating trace file.
+
+    with metrics.span("export.push", objects=n):
+        ...
+    metrics.count("rfem.objects_sent", n)
+"""
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+TRACE_PATH = Path(os.environ.get("BRIDGE_METRICS_TRACE",
+                                 Path.home() / ".cache" / "rfem-bridge-demo" / "trace.jsonl"))
+TRACE_MAX_BYTES = 10 * 1024**2
+TRACE_BACKUPS = 3
+MAX_EVENTS = 100_000
+
+enabled = False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class Span:
+    __slots__ = ("registry", "name", "attrs", "start")
+
+    def __init__(self, registry: "Registry", name: str, attrs: dict):
+        self.registry, self.name, self.attrs = registry, name, attrs
+
+    def set(self, **attrs):
+        """Attach values known only inside the span (sizes, counts)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.registry._record(self.name, self.start, time.perf_counter_ns() - self.start, self.attrs)
+        return False
+
+
+class Registry:
+    def __init__(self, max_events: int = MAX_EVENTS):
+        self._lock = threading.Lock()
+        self.spans: dict[str, list] = {}        # name -> [count, total s, max s]
+        self.counters: dict[str, float] = {}
+        self.events = deque(maxlen=max_events)
+        self._log: logging.Logger = None
+        self._t0 = time.perf_counter_ns()
+
+    def open_trace(self, path=TRACE_PATH, max_bytes: int = TRACE_MAX_BYTES, backups: int = TRACE_BACKUPS):
+        """Also write every event as a JSON line to ``path`` (rotated at ``max_bytes``)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                       encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log = logging.getLogger(f"{__name__}.trace")
+        log.propagate = False
+        log.setLevel(logging.INFO)
+        self.close_trace()
+        log.addHandler(handler)
+        self._log = log
+
+    def close_trace(self):
+        log = logging.getLogger(f"{__name__}.trace")
+        for handler in list(log.handlers):
+            log.removeHandler(handler)
+            handler.close()
+        self._log = None
+
+    def _record(self, name: str, start_ns: int, dur_ns: int, attrs: dict):
+        seconds = dur_ns / 1e9
+        event = {"name": name, "ph": "X", "ts": (start_ns - self._t0) / 1000, "dur": dur_ns / 1000,
+                 "pid": os.getpid(), "tid": threading.get_ident(), "args": attrs}
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+            self.events.append(event)
+        if self._log is not None:
+            self._log.info(json.dumps({"t": time.time(), "span": name, "s": seconds, **attrs}, default=str))
+
+    def count(self, name: str, n: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            self.events.append({"name": name, "ph": "C", "ts": (time.perf_counter_ns() - self._t0) / 1000,
+                                "pid": os.getpid(), "args": {name: self.counters[name]}})
+        if self._log is not None:
+            self._log.info(json.dumps({"t": time.time(), "counter": name, "n": n}))
+
+    def snapshot(self) -> dict:
+        """Span statistics and counters as plain data."""
+        with self._lock:
+            return {
+                "spans": {name: {"count": c, "total": total, "mean": total / c, "max": mx}
+                          for name, (c, total, mx) in self.spans.items()},
+                "counters": dict(self.counters),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+            self.events.clear()
+
+    def export_chrome_trace(self, path):
+        """Write the kept events in Chrome trace event format."""
+        with self._lock:
+            events = list(self.events)
+        Path(path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str))
+
+
+registry = Registry()
+
+
+def span(name: str, **attrs):
+    """Context manager timing a block under ``name`` (no-op while disabled)."""
+    if not enabled:
+        return _NULL
+    return Span(registry, name, attrs)
+
+
+def count(name: str, n: float = 1):
+    """Add ``n`` to counter ``name`` (no-op while disabled)."""
+    if enabled:
+        registry.count(name, n)
+
+
+def enable(trace_path=TRACE_PATH):
+    """Start collecting; ``trace_path=None`` keeps events in memory only."""
+    global enabled
+    if trace_path is not None:
+        registry.open_trace(trace_path)
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+    registry.close_trace()
+
+
+def snapshot() -> dict:
+    return registry.snapshot()
+
+
+def export_chrome_trace(path):
+    registry.export_chrome_trace(path)
+
+
+def format_snapshot(snap: dict = None) -> str:
+    """Text table of ``snapshot()`` (the UI metrics panel)."""
+    snap = snap or snapshot()
+    lines = [f"{'span':<24}{'n':>6}{'total s':>10}{'mean ms':>10}{'max ms':>10}"]
+    for name, s in sorted(snap["spans"].items(), key=lambda kv: -kv[1]["total"]):
+        lines.append(f"{name:<24}{s['count']:>6}{s['total']:>10.3f}{1e3 * s['mean']:>10.1f}{1e3 * s['max']:>10.1f}")
+    lines.append("")
+    lines += [f"{name:<34}{value:>16,.0f}" for name, value in sorted(snap["counters"].items())]
+    return "\n".join(lines)
+
+
+if os.environ.get("BRIDGE_METRICS", "") not in ("", "0"):
+    enable()
@@ -0,0 +1,163 @@
+"""Binary save format for generated models, loaded memory-mapped.
+
+Layout (little-endian)::
+
+    b"BRIDGEFE"  uint32 version  uint32 header length
+    header       UTF-8 JSON: category names, supports, sections,
+                 parameters, results, and per array dtype/shape/offset
+    padding      to a 64-byte boundary
+    arrays       raw C-order data, each starting on a 64-byte boundary
+
+Array offsets are relative to the start of the array block. ``load_model``
+maps each array copy-on-write (``np.memmap`` mode "c"): opening a large
+model reads only the header, only the pages that are touched are read
+later, and edits (e.g. ``regen`` updates) stay in memory and never reach
+the file.
+"""
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from objects import FEAModel
+
+MAGIC = b"BRIDGEFE"
+VERSION = 1
+ALIGN = 64
+SUFFIX = ".bridge"
+
+_PREFIX = struct.Struct("<8sII")
+ARRAYS = ("coords", "line_nodes", "line_type", "line_section",
+          "surface_nodes", "surface_thickness", "surface_family")
+
+
+class ModelFormatError(ValueError):
+    """Not a model file, or one written by a newer version."""
+
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def _mapped_file(a: np.ndarray) -> str | None:
+    while a is not None:
+        if isinstance(a, np.memmap):
+            return a.filename
+        a = getattr(a, "base", None)
+    return None
+
+
+def detach(fea: FEAModel, path=None):
+    """Copy the arrays of ``fea`` mapped from ``path`` (any file if None) into memory.
+
+    A file still mapped cannot be replaced on Windows; ``save_model``
+    detaches the model it writes from the target file first.
+    """
+    target = None if path is None else os.path.abspath(path)
+    for name in ["_" + a for a in ARRAYS] + ["displacements"]:
+        a = getattr(fea, name)
+        mapped = _mapped_file(a)
+        if mapped is not None and (target is None or os.path.abspath(mapped) == target):
+            setattr(fea, name, np.array(a))
+
+
+def save_model(path, fea: FEAModel, params: dict = None):
+    """Write ``fea`` (and the ``params`` it was generated from) to ``path``."""
+    detach(fea, path)
+    arrays = {name: np.ascontiguousarray(getattr(fea, name)) for name in ARRAYS}
+    if fea.displacements is not None:
+        arrays["displacements"] = np.ascontiguousarray(fea.displacements, dtype=np.float64)
+    arrays["support_nodes"] = np.array([n for s in fea.supports for n in s.node_ids], dtype=np.int32)
+    arrays = {name: a.astype(a.dtype.newbyteorder("<"), copy=False) for name, a in arrays.items()}
+
+    layout, offset = {}, 0
+    for name, a in arrays.items():
+        layout[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+        offset = _aligned(offset + a.nbytes)
+    header = json.dumps({
+        "tol": fea.tol,
+        "line_types": fea.line_types, "sections": fea.sections, "surface_families": fea.surface_families,
+        "supports": [[s.id, s.type, len(s.node_ids)] for s in fea.supports],
+        "support_counter": fea.support_counter,
+        "merged_nodes": fea.merged_nodes,
+        "flange_width": getattr(fea, "flange_width", None),
+        "flange_thickness": getattr(fea, "flange_thickness", None),
+        "max_deflection": fea.max_deflection,
+        "params": params,
+        "arrays": layout,
+    }).encode()
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for name, a in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                a.tofile(f)
+            f.truncate(data_start + offset)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read_header(path) -> tuple[dict, int]:
+    """The JSON header of a model file and where its array block starts."""
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ModelFormatError(f"{path}: not a bridge model file")
+        magic, version, size = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ModelFormatError(f"{path}: not a bridge model file")
+        if version > VERSION:
+            raise ModelFormatError(f"{path}: format version {version}, this build reads up to {VERSION}")
+        header = json.loads(f.read(size))
+    return header, _aligned(_PREFIX.size + size)
+
+
+def load_model(path, mmap: bool = True) -> tuple[FEAModel, dict | None]:
+    """Open a model written by ``save_model``; returns ``(fea, params)``.
+
+    With ``mmap`` the arrays are copy-on-write memory maps of the file;
+    without, they are read into memory.
+    """
+    header, data_start = read_header(path)
+
+    def array(name):
+        spec = header["arrays"].get(name)
+        if spec is None:
+            return None
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        if int(np.prod(shape)) == 0:
+            return np.zeros(shape, dtype=dtype)
+        if mmap:
+            return np.memmap(path, dtype=dtype, mode="c", offset=data_start + spec["offset"], shape=shape)
+        count = int(np.prod(shape))
+        return np.fromfile(path, dtype=dtype, count=count, offset=data_start + spec["offset"]).reshape(shape)
+
+    support_nodes = array("support_nodes").tolist()
+    supports, i = [], 0
+    for sid, stype, n in header["supports"]:
+        supports.append((sid, support_nodes[i:i + n], stype))
+        i += n
+
+    fea = FEAModel.from_arrays(
+        *(array(name) for name in ARRAYS),
+        line_types=header["line_types"], sections=header["sections"],
+        surface_families=header["surface_families"], supports=supports, tol=header["tol"],
+    )
+    fea.support_counter = header["support_counter"]
+    fea.merged_nodes = header["merged_nodes"]
+    for attr in ("flange_width", "flange_thickness"):
+        if header[attr] is not None:
+            setattr(fea, attr, header[attr])
+    fea.max_deflection = header["max_deflection"]
+    fea.displacements = array("displacements")
+    return fea, header["params"]
@@ -0,0 +1,157 @@
+"""Incremental regeneration of the bridge FE model.
+
+Every parameter of ``BridgeUI.params`` (the keys ``update_from_dict``
+accepts) maps to the parts of the model it affects in ``PARAM_EFFECTS``.
+``BridgeModel.update`` applies thickness and section changes as
+attribute updates, moves nodes in place for depth, spacing and overhang
+changes, and remeshes only when the topology changes. The returned
+``Changeset`` tells export and rendering what they can skip.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from objects import FEAModel, build_fea
+
+# parameter -> what it touches:
+#   deck_thickness / web_thickness  surface thickness of that family
+#   section                         flange section (fea.flange_width/thickness)
+#   coords                          node coordinates, same topology
+#   topology                        nodes, lines and surfaces are remeshed
+PARAM_EFFECTS = {
+    "deck_thickness": {"deck_thickness"},
+    "web_thickness": {"web_thickness"},
+    "flange_width": {"section"},
+    "flange_thickness": {"section"},
+    "girder_depth": {"coords"},
+    "girder_spacing": {"coords"},
+    "overhang": {"coords"},
+    "span_lengths": {"topology"},
+    "number_of_girders": {"topology"},
+    "mesh_size": {"topology"},
+    "min_mesh_size": {"topology"},
+    "element_budget": {"topology"},
+    "crossframe_spacing": {"topology"},
+}
+
+
+@dataclass
+class Changeset:
+    """What an update changed; ``rebuilt`` means a new model, so everything."""
+    params: set[str] = field(default_factory=set)
+    rebuilt: bool = False
+    coords: bool = False
+    thickness: bool = False
+    section: bool = False
+
+    def __bool__(self):
+        return self.rebuilt or self.coords or self.thickness or self.section
+
+    def merge(self, other: "Changeset") -> "Changeset":
+        return Changeset(self.params | other.params, self.rebuilt or other.rebuilt,
+                         self.coords or other.coords, self.thickness or other.thickness,
+                         self.section or other.section)
+
+    @property
+    def export_stages(self) -> set[str] | None:
+        """``rfem_conn.export_stages`` names to rebuild, or None for all of them."""
+        if self.rebuilt:
+            return None
+        stages = set()
+        if self.coords:
+            stages.add("nodes")
+        if self.thickness:
+            stages.add("surfaces")
+        if self.section:
+            stages.add("materials")
+        return stages
+
+    @property
+    def redraw(self) -> bool:
+        """The preview only shows geometry; thickness and sections do not change it."""
+        return self.rebuilt or self.coords
+
+
+def _differs(a, b) -> bool:
+    if isinstance(a, (list, tuple)) or isinstance(b, (list, tuple)):
+        return list(a) != list(b)
+    return a != b
+
+
+class BridgeModel:
+    """A generated FEAModel plus the parameters it was generated from."""
+    def __init__(self, params: dict, fea: FEAModel = None):
+        self.params = dict(params)
+        self.fea = build_fea(self.params) if fea is None else fea
+
+    def changed(self, changes: dict) -> dict:
+        """The entries of ``changes`` that differ from the current parameters."""
+        return {k: v for k, v in changes.items()
+                if k in PARAM_EFFECTS and _differs(v, self.params.get(k))}
+
+    def effects(self, changes: dict) -> set[str]:
+        """What applying ``changes`` would touch (see ``PARAM_EFFECTS``)."""
+        changed = self.changed(changes)
+        effects = set().union(*(PARAM_EFFECTS[k] for k in changed))
+        # overhang rows only exist for a non-zero overhang
+        if "overhang" in changed and min(abs(self.params["overhang"]), abs(changed["overhang"])) <= self.fea.tol:
+            effects.add("topology")
+        return effects
+
+    def update(self, changes: dict, cancel=None) -> Changeset:
+        """Apply changed parameters to ``self.fea``, in place where possible."""
+        changed = self.changed(changes)
+        cs = Changeset(set(changed))
+        if not changed:
+            return cs
+        old, new = self.params, {**self.params, **changed}
+        effects = self.effects(changed)
+
+        if "topology" in effects:
+            self.fea = build_fea(new, cancel)
+            self.params = new
+            cs.rebuilt = True
+            return cs
+
+        fea = self.fea
+        if "coords" in effects:
+            self._move_nodes(old, new)
+            cs.coords = True
+        for family in ("deck", "web"):
+            if f"{family}_thickness" in effects:
+                code = fea.family_code(family)
+                if code >= 0:
+                    fea.surface_thickness[fea.surface_family == code] = new[f"{family}_thickness"]
+                cs.thickness = True
+        if "section" in effects:
+            fea.flange_width = new["flange_width"]
+            fea.flange_thickness = new["flange_thickness"]
+            cs.section = True
+
+        # results belong to the old model
+        fea.max_deflection = None
+        fea.displacements = None
+        self.params = new
+        return cs
+
+    def _move_nodes(self, old: dict, new: dict):
+        """Re-place nodes for new depth/spacing/overhang (all sit at z = 0 or depth)."""
+        fea = self.fea
+        tol = fea.tol
+        xyz = fea.coords
+        n_g = old["number_of_girders"]
+
+        # lateral row of every node on the old values: girder k, left or right overhang
+        s_old = old["girder_spacing"]
+        k = np.rint(xyz[:, 1] / s_old) if s_old else np.zeros(len(xyz))
+        on_girder = (np.abs(xyz[:, 1] - k * s_old) <= tol) & (k >= 0) & (k <= n_g - 1)
+        left = ~on_girder & (np.abs(xyz[:, 1] + old["overhang"]) <= tol)
+        right = ~on_girder & (np.abs(xyz[:, 1] - ((n_g - 1) * s_old + old["overhang"])) <= tol)
+        top = np.abs(xyz[:, 2] - old["girder_depth"]) <= tol
+
+        s_new = new["girder_spacing"]
+        xyz[on_girder, 1] = k[on_girder] * s_new
+        xyz[left, 1] = -new["overhang"]
+        xyz[right, 1] = (n_g - 1) * s_new + new["overhang"]
+        xyz[top, 2] = new["girder_depth"]
+        fea.reindex()
@@ -0,0 +1,205 @@
+"""3D preview of an FEAModel.
+
+Everything is drawn straight from the model arrays as a handful of
+batched artists: one Line3DCollection per line section, one
+Poly3DCollection per surface family, one scatter for the nodes and one
+for the supports. The artist count does not grow with the mesh, and for
+large meshes a coarse level of detail keeps the primitive count bounded
+too.
+"""
+import numpy as np
+from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (registers the 3d projection)
+from mpl_toolkits.mplot3d.art3d import Line3DCollection, Poly3DCollection
+
+import metrics
+from objects import FEAModel, span_ranges
+
+SURFACE_STYLE = {
+    "deck": dict(alpha=0.3, facecolor="lightblue"),
+    "web": dict(alpha=0.3, facecolor="lightsteelblue"),
+}
+_DEFAULT_SURFACE = dict(alpha=0.3, facecolor="lightblue")
+
+
+LOD_THRESHOLD = 20000   # elements above which "auto" draws the coarse preview
+
+
+def draw_3d(fea: FEAModel, ax, lod: str = "auto", span: tuple[float, float] = None):
+    """Draw ``fea`` on the 3D axes ``ax``.
+
+    ``lod`` is "full", "coarse" or "auto" (coarse above ``LOD_THRESHOLD``
+    elements). The coarse preview draws one polygon per bay and plane
+    (bays run between cross-frame and support stations), each girder
+    flange as a single line and only the support nodes, so its cost does
+    not depend on ``mesh_size``. ``span=(x0, x1)`` draws that stretch in
+    full detail on top of a coarse rest.
+    """
+    ax.clear()
+    coords = fea.coords
+    if not len(coords):
+        return
+
+    # Supports (green triangles)
+    support_ids = [nid for s in fea.supports for nid in s.node_ids]
+    if support_ids:
+        xs, ys, zs = coords[np.asarray(support_ids) - 1].T
+        ax.scatter(xs, ys, zs, color="green", s=50, marker="^")
+
+    if lod == "auto":
+        lod = "coarse" if fea.n_lines + fea.n_surfaces > LOD_THRESHOLD else "full"
+    with metrics.span("draw_3d", lod=lod, elements=fea.n_lines + fea.n_surfaces):
+        if lod == "full" and span is None:
+            _draw_full(fea, ax)
+        else:
+            _draw_coarse(fea, ax, window=span)
+            if span is not None:
+                _draw_full(fea, ax, window=span)
+
+    xs, ys, zs = coords.T
+    set_equal_3d(ax, xs, ys, zs)
+
+    # --- cleanup view ---
+    ax.set_axis_off()        # hides all axes, ticks, labels
+    ax.grid(False)           # no grid
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.set_zticks([])
+    ax.margins(0)                # remove margins
+    ax.figure.tight_layout()     # tight layout for full fit
+    ax.figure.subplots_adjust(left=0, right=1, top=1, bottom=0)  # full bleed
+    ax.set_title("FEA Placeholder View (3D)")
+
+
+def _draw_full(fea: FEAModel, ax, window=None):
+    coords = fea.coords
+    line_mask = np.ones(fea.n_lines, dtype=bool)
+    surface_mask = np.ones(fea.n_surfaces, dtype=bool)
+    node_mask = np.ones(fea.n_nodes, dtype=bool)
+    if window is not None:
+        inside = (coords[:, 0] >= window[0] - fea.tol) & (coords[:, 0] <= window[1] + fea.tol)
+        node_mask = inside
+        line_mask = inside[fea.line_nodes - 1].all(axis=1)
+        surface_mask = inside[fea.surface_nodes - 1].all(axis=1)
+
+    # Lines (beams, cross-frames), one collection per section
+    segments = coords[fea.line_nodes - 1]
+    for code, name in enumerate(fea.sections):
+        mask = (fea.line_section == code) & line_mask
+        if mask.any():
+            ax.add_collection3d(Line3DCollection(segments[mask], colors="k", linewidths=1.5, label=name))
+
+    # Surfaces (deck, webs), one collection per family
+    quads = coords[fea.surface_nodes - 1]
+    for code, name in enumerate(fea.surface_families):
+        mask = (fea.surface_family == code) & surface_mask
+        if mask.any():
+            ax.add_collection3d(Poly3DCollection(quads[mask], label=name,
+                                                 **SURFACE_STYLE.get(name, _DEFAULT_SURFACE)))
+
+    xs, ys, zs = coords[node_mask].T
+    ax.scatter(xs, ys, zs, color="red", s=10)   # s=point size
+
+
+def _unique_within(values: np.ndarray, tol: float) -> np.ndarray:
+    values = np.unique(values)
+    if len(values) < 2:
+        return values
+    return values[np.concatenate([[True], np.diff(values) > tol])]
+
+
+def _bay_breaks(fea: FEAModel) -> np.ndarray:
+    """Stations bounding the coarse bays: model ends, supports and cross-frames."""
+    xs = [fea.coords[:, 0].min(), fea.coords[:, 0].max()]
+    xs += [a for a, _ in span_ranges(fea)]
+    code = fea.section_code("crossframe")
+    if code >= 0:
+        xs += fea.coords[fea.line_nodes[fea.line_section == code] - 1, 0].ravel().tolist()
+    return _unique_within(np.asarray(xs, dtype=np.float64), fea.tol)
+
+
+def _outside(lo: np.ndarray, hi: np.ndarray, window) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Parts of the x ranges [lo, hi] left and right of ``window`` (all of them if None)."""
+    if window is None:
+        return [(lo, hi)]
+    return [(lo, np.minimum(hi, window[0])), (np.maximum(lo, window[1]), hi)]
+
+
+def _draw_coarse(fea: FEAModel, ax, window=None):
+    coords, tol = fea.coords, fea.tol
+
+    # Lines along x (girder flanges) are merged into one segment per
+    # section and (y, z); the others (cross-frames) do not grow with the
+    # mesh and are drawn as they are
+    ends = coords[fea.line_nodes - 1]                         # (m, 2, 3)
+    along_x = (np.abs(ends[:, 0, 1:] - ends[:, 1, 1:]) <= tol).all(axis=1)
+    keys = np.column_stack([fea.line_section, np.round(ends[:, 0, 1:] / tol)])
+    for code, name in enumerate(fea.sections):
+        is_code = fea.line_section == code
+        segments = []
+        runs = is_code & along_x
+        if runs.any():
+            _, group = np.unique(keys[runs], axis=0, return_inverse=True)
+            group = group.ravel()
+            n = group.max() + 1
+            lo, hi = np.full(n, np.inf), np.full(n, -np.inf)
+            np.minimum.at(lo, group, ends[runs, :, 0].min(axis=1))
+            np.maximum.at(hi, group, ends[runs, :, 0].max(axis=1))
+            yz = np.zeros((n, 2))
+            yz[group] = ends[runs, 0, 1:]
+            for a, b in _outside(lo, hi, window):
+                keep = b - a > tol
+                segments += [[(x0, y, z), (x1, y, z)] for x0, x1, (y, z) in zip(a[keep], b[keep], yz[keep])]
+        others = is_code & ~along_x
+        if window is not None:
+            x = ends[:, :, 0]
+            others &= ~((x >= window[0] - tol) & (x <= window[1] + tol)).all(axis=1)
+        segments += ends[others].tolist()
+        if segments:
+            ax.add_collection3d(Line3DCollection(segments, colors="k", linewidths=1.5, label=name))
+
+    # Surfaces: quads of one family lying in one plane (y = const for webs,
+    # z = const for the deck) are merged into one rectangle per bay
+    breaks = _bay_breaks(fea)
+    quads = coords[fea.surface_nodes - 1]                     # (k, 4, 3)
+    if not len(quads):
+        return
+    qmin, qmax = quads.min(axis=1), quads.max(axis=1)
+    normal = np.where(qmax[:, 1] - qmin[:, 1] <= qmax[:, 2] - qmin[:, 2], 1, 2)
+    level = np.round(np.take_along_axis(qmin, normal[:, None], axis=1)[:, 0] / tol)
+    bay = np.clip(np.searchsorted(breaks, quads[:, :, 0].mean(axis=1)) - 1, 0, max(len(breaks) - 2, 0))
+    if window is not None:
+        keep = (breaks[bay + 1] <= window[0] + tol) | (breaks[bay] >= window[1] - tol)
+    else:
+        keep = np.ones(len(quads), dtype=bool)
+    for code, name in enumerate(fea.surface_families):
+        mask = (fea.surface_family == code) & keep
+        if not mask.any():
+            continue
+        _, group = np.unique(np.column_stack([normal[mask], level[mask], bay[mask]]),
+                             axis=0, return_inverse=True)
+        group = group.ravel()
+        n = group.max() + 1
+        lo, hi = np.full((n, 3), np.inf), np.full((n, 3), -np.inf)
+        np.minimum.at(lo, group, qmin[mask])
+        np.maximum.at(hi, group, qmax[mask])
+        axis = np.zeros(n, dtype=int)
+        axis[group] = normal[mask]
+        polys = np.repeat(lo[:, None, :], 4, axis=1)
+        polys[:, [1, 2], 0] = hi[:, None, 0]
+        other = 3 - axis                                      # z for webs, y for the deck
+        rows = np.arange(n)
+        polys[rows, 2, other] = hi[rows, other]
+        polys[rows, 3, other] = hi[rows, other]
+        ax.add_collection3d(Poly3DCollection(polys, label=name,
+                                             **SURFACE_STYLE.get(name, _DEFAULT_SURFACE)))
+
+
+def set_equal_3d(ax, X, Y, Z):
+    """Force equal aspect ratio in 3D plots."""
+    lo = np.array([np.min(X), np.min(Y), np.min(Z)])
+    hi = np.array([np.max(X), np.max(Y), np.max(Z)])
+    max_range = (hi - lo).max() / 2.0
+    mid_x, mid_y, mid_z = (hi + lo) * 0.5
+    ax.set_xlim(mid_x - max_range, mid_x + max_range)
+    ax.set_ylim(mid_y - max_range, mid_y + max_range)
+    ax.set_zlim(mid_z - max_range, mid_z + max_range)
@@ -0,0 +1,61 @@
+"""Selective RFEM result retrieval into arrays aligned to FEAModel node ids.
+
+Instead of pulling a whole results table, callers name the result type,
+the nodes (e.g. ``objects.midspan_nodes``) and the columns they need.
+Values come back as one float array per column, row = node id - 1, with
+NaN for nodes that were not requested.
+"""
+import numpy as np
+from dlubal.api import rfem
+
+import metrics
+from objects import FEAModel
+
+DEFORMATION_COLUMNS = ("u_x", "u_y", "u_z", "phi_x", "phi_y", "phi_z")
+
+
+def node_filter(node_ids) -> list:
+    """``ResultsFilter`` restricting a node results query to ``node_ids`` (empty = all nodes)."""
+    if node_ids is None:
+        return []
+    ids = np.unique(np.asarray(node_ids, dtype=np.int64).ravel())
+    return [rfem.results.ResultsFilter(column_id="node_no", filter_expression=",".join(map(str, ids.tolist())))]
+
+
+def node_results(rfem_app, n_nodes: int, columns=DEFORMATION_COLUMNS, node_ids=None,
+                 results_type=rfem.results.STATIC_ANALYSIS_NODES_GLOBAL_DEFORMATIONS,
+                 model_id=None) -> dict[str, np.ndarray]:
+    """Fetch ``columns`` of a node results table for ``node_ids`` (all nodes if None).
+
+    Returns ``{column: (n_nodes,) float array}``; columns the table does
+    not have are all NaN. If the table holds several rows per node, the
+    one with the largest magnitude is kept.
+    """
+    df = rfem_app.get_results(results_type=results_type, filters=node_filter(node_ids),
+                              model_id=model_id).data
+    metrics.count("rfem.bytes_received", int(df.memory_usage(index=False).sum()))
+    nos = df["node_no"].to_numpy() if "node_no" in df else np.zeros(0)
+    valid = np.isfinite(nos.astype(np.float64)) & (nos >= 1) & (nos <= n_nodes)
+    rows = nos[valid].astype(np.int64) - 1
+    out = {}
+    for name in columns:
+        arr = np.full(n_nodes, np.nan)
+        if name in df and len(rows):
+            values = df[name].to_numpy(dtype=np.float64)[valid]
+            # largest magnitude wins: write in ascending |value| order
+            order = np.argsort(np.abs(np.nan_to_num(values)), kind="stable")
+            arr[rows[order]] = values[order]
+        out[name] = arr
+    return out
+
+
+def store_deformations(fea: FEAModel, columns: dict[str, np.ndarray]):
+    """Put fetched deformations on ``fea`` like the local solver does.
+
+    ``fea.displacements`` gets the (n_nodes, 6) array (NaN where not
+    fetched) and ``fea.max_deflection`` the largest translation magnitude.
+    """
+    disp = np.column_stack([columns.get(name, np.full(fea.n_nodes, np.nan)) for name in DEFORMATION_COLUMNS])
+    fea.displacements = disp
+    u = np.linalg.norm(disp[:, :3], axis=1)
+    fea.max_deflection = float(np.nanmax(u)) if np.isfinite(u).any() else None
@@ -0,0 +1,125 @@
+"""Content-addressed on-disk cache of analysis results.
+
+Entries are keyed by a hash of the generated FEAModel (geometry,
+connectivity, sections, thicknesses, supports) plus the analysis
+settings, and hold named result columns (e.g. per-node ux, uy, uz) as a
+compressed ``.npz``. The directory is capped in size; the least recently
+used entries are evicted first.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from objects import FEAModel
+
+CACHE_DIR = Path(os.environ.get("BRIDGE_RESULTS_CACHE",
+                                Path.home() / ".cache" / "rfem-bridge-demo" / "results"))
+MAX_BYTES = 256 * 1024**2
+
+_KEY_VERSION = b"fea-results-v2"
+
+
+def model_key(fea: FEAModel, settings: dict) -> str:
+    """Canonical hash of ``fea`` and the analysis ``settings`` (JSON-serialisable)."""
+    h = hashlib.sha256(_KEY_VERSION)
+
+    def add(arr):
+        arr = np.ascontiguousarray(arr)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+
+    add(fea.coords)
+    add(fea.line_nodes)
+    # categories by name, so the hash does not depend on code order
+    h.update(json.dumps([fea.line_types, fea.sections, fea.surface_families]).encode())
+    add(np.array(fea.line_types, dtype=object)[fea.line_type].astype(str) if fea.n_lines else np.zeros(0, "U1"))
+    add(np.array(fea.sections, dtype=object)[fea.line_section].astype(str) if fea.n_lines else np.zeros(0, "U1"))
+    add(fea.surface_nodes)
+    add(fea.surface_thickness)
+    # the family picks the shell material (steel webs, concrete deck)
+    add(np.array(fea.surface_families, dtype=object)[fea.surface_family].astype(str) if fea.n_surfaces else np.zeros(0, "U1"))
+    h.update(json.dumps([[s.id, [int(n) for n in s.node_ids], s.type] for s in fea.supports]).encode())
+    h.update(json.dumps({"flange_width": getattr(fea, "flange_width", None),
+                         "flange_thickness": getattr(fea, "flange_thickness", None),
+                         "settings": settings}, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class ResultsCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def get(self, key: str) -> dict[str, np.ndarray] | None:
+        """Cached columns for ``key``, or None. A hit refreshes the entry's LRU time."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = {name: data[name] for name in data.files}
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return columns
+
+    def put(self, key: str, columns: dict[str, np.ndarray]):
+        """Store ``columns`` (name -> 1-D array) under ``key`` and evict down to the size cap."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **{name: np.asarray(col) for name, col in columns.items()})
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the directory fits in ``max_bytes``."""
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for path in self.directory.glob("*.npz"):
+            path.unlink(missing_ok=True)
+
+
+_cache: ResultsCache = None
+
+
+def get_cache() -> ResultsCache:
+    """Process-wide cache in ``CACHE_DIR`` (override with ``set_cache``)."""
+    global _cache
+    if _cache is None:
+        _cache = ResultsCache()
+    return _cache
+
+
+def set_cache(cache: ResultsCache):
+    global _cache
+    _cache = cache
@@ -1,99 +1,348 @@
+import hashlib
+import logging
+import math
+import queue
+import threading
+
+import numpy as np
 from dlubal.api import rfem
-from matplotlib.pylab import inf
 
-from config import RFEM_KEY
+import metrics
+import results
+import results_cache
+import rfem_session
 from objects import FEAModel
 
-api_key = RFEM_KEY
+log = logging.getLogger(__name__)
+
+# What each model was last pushed with: model name -> {(object class, no): content digest}.
+# Lets a re-export send only the objects that were created, modified or deleted.
+_pushed: dict[str, dict[tuple[type, int], bytes]] = {}
+_model_ids: dict[str, object] = {}
+
+CHUNK_SIZE = 2000   # objects per create/update call
+
+# Analysis settings that go into the results cache key
+_ANALYSIS = {"analysis": "rfem-static", "load_cases": ["self weight"], "skip_warnings": True,
+             "results": "STATIC_ANALYSIS_NODES_GLOBAL_DEFORMATIONS", "columns": results.DEFORMATION_COLUMNS}
+
+
+class ExportCancelled(Exception):
+    """Raised by fea_to_rfem when its cancel event is set mid-export."""
+
 
-def fea_to_rfem(fea: FEAModel, model_name="bridge_model"):
-    with rfem.Application(api_key_value=api_key) as rfem_app:
-        rfem_app.create_model(name=model_name)
-        rfem_app.delete_all_objects()
-        lst = []
+class ExportError(RuntimeError):
+    """A chunk was rejected by RFEM; names the stage and object numbers involved."""
 
-        # Materials
-        steel = rfem.structure_core.Material(no=1, name="S450 | EN 1993-1-1:2005-05")
-        conc  = rfem.structure_core.Material(no=2, name="C30/37 | EN 1992-1-1:2004-11")
-        lst += [steel, conc]
 
+def _is_member_section(name: str) -> bool:
+    return "flange" in name or "crossframe" in name
+
+
+def export_stages(fea: FEAModel) -> list[tuple[str, int, object]]:
+    """RFEM objects for ``fea`` as lazy ``(stage, count, generator)`` triples in dependency order."""
+    first_new = max(10000, fea.n_lines + 1)
+    edge_lines, new_lines = fea.surface_edge_lines(first_new)
+    section_names = fea.sections
+    n_members = sum(int((fea.line_section == code).sum())
+                    for code, name in enumerate(section_names) if _is_member_section(name))
+    # one Thickness per distinct value and material (steel webs, concrete deck),
+    # numbered in order of first use (webs, then deck)
+    material = np.where(fea.surface_family == fea.family_code("web"), 1, 2)
+    values, first, inverse = np.unique(np.column_stack([fea.surface_thickness, material]), axis=0,
+                                       return_index=True, return_inverse=True)
+    order = np.argsort(first)
+
+    def materials():
+        yield rfem.structure_core.Material(no=1, name="S450 | EN 1993-1-1:2005-05")
+        yield rfem.structure_core.Material(no=2, name="C30/37 | EN 1992-1-1:2004-11")
         # Sections
-        lst.append(rfem.structure_core.Section(no=1, material=1, name=f"R_M1 {fea.flange_width}/{fea.flange_thickness}"))   # girders
-        lst.append(rfem.structure_core.Section(no=2, material=1, name="L 100x10"))  # cross-frames
-
-        # Nodes
-        for n in fea.nodes.values():
-            lst.append(rfem.structure_core.Node(
-                no=n.id, coordinate_1=n.x, coordinate_2=n.y, coordinate_3=-n.z
-            ))
-
-        # Lines (from FE model)
-        for l in fea.lines:
-            lst.append(rfem.structure_core.Line(
-                no=l.id, definition_nodes=[l.node_start, l.node_end]
-            ))
-
-        # Members
-        for l in fea.lines:
-            if "flange" in l.section:  # girders
-                lst.append(rfem.structure_core.Member(
-                    no=1000+l.id, line=l.id, section_start=1
-                ))
-            elif "crossframe" in l.section:  # cross-frames
-                lst.append(rfem.structure_core.Member(
-                    no=2000+l.id, line=l.id, section_start=2,
+        yield rfem.structure_core.Section(no=1, material=1, name=f"R_M1 {fea.flange_width}/{fea.flange_thickness}")   # girders
+        yield rfem.structure_core.Section(no=2, material=1, name="L 100x10")  # cross-frames
+
+    def nodes():
+        for nid, (x, y, z) in enumerate(fea.coords.tolist(), start=1):
+            yield rfem.structure_core.Node(
+                no=nid, coordinate_1=x, coordinate_2=y, coordinate_3=-z
+            )
+
+    def lines():
+        # Lines from the FE model, then the extra surface boundary lines from
+        # the shared-edge index (flange/crossframe lines are reused there)
+        for lid, (n1, n2) in enumerate(fea.line_nodes.tolist(), start=1):
+            yield rfem.structure_core.Line(no=lid, definition_nodes=[n1, n2])
+        for line_no, (n_start, n_end) in enumerate(new_lines.tolist(), start=first_new):
+            yield rfem.structure_core.Line(no=line_no, definition_nodes=[n_start, n_end])
+
+    def members():
+        for lid, code in enumerate(fea.line_section.tolist(), start=1):
+            if "flange" in section_names[code]:  # girders
+                yield rfem.structure_core.Member(
+                    no=1000+lid, line=lid, section_start=1
+                )
+            elif "crossframe" in section_names[code]:  # cross-frames
+                yield rfem.structure_core.Member(
+                    no=2000+lid, line=lid, section_start=2,
                     type=rfem.structure_core.Member.TYPE_TRUSS
-                ))
-
-        # Surfaces (deck panels)
-        surface_no = 1
-        line_no = 10000
-        for s in fea.surfaces:
-            nids = [s.node_1, s.node_2, s.node_3, s.node_4]
-            b_lines = []
-            for i in range(4):
-                n_start, n_end = nids[i], nids[(i+1)%4]
-                lst.append(rfem.structure_core.Line(no=line_no, definition_nodes=[n_start, n_end]))
-                b_lines.append(line_no)
-                line_no += 1
-            lst.append(rfem.structure_core.Surface(no=surface_no, boundary_lines=b_lines))
-            surface_no += 1
-
-        # Thickness (applied to all deck surfaces)
-        lst.append(
-            rfem.structure_core.Thickness(
-                no=1,
-                material=2,
-                uniform_thickness=fea.surfaces[0].thickness if fea.surfaces else 0.25,
-                assigned_to_surfaces=list(range(1, surface_no))
+                )
+
+    def surfaces():
+        for surface_no, b_lines in enumerate(edge_lines.tolist(), start=1):
+            yield rfem.structure_core.Surface(no=surface_no, boundary_lines=b_lines)
+        # Thicknesses (webs and deck)
+        for no, k in enumerate(order.tolist(), start=1):
+            yield rfem.structure_core.Thickness(
+                no=no,
+                material=int(values[k, 1]),
+                uniform_thickness=float(values[k, 0]),
+                assigned_to_surfaces=(np.flatnonzero(inverse.ravel() == k) + 1).tolist()
             )
-        )
 
-        # Supports
+    def supports():
         for s in fea.supports:
-            lst.append(
-                rfem.types_for_nodes.NodalSupport(
-                    no=s.id,
-                    nodes=s.node_ids,
-                    spring_x=inf, spring_y=inf, spring_z=inf
-                )
+            yield rfem.types_for_nodes.NodalSupport(
+                no=s.id,
+                nodes=s.node_ids,
+                spring_x=math.inf, spring_y=math.inf, spring_z=math.inf
             )
 
-        lst.append(rfem.loading.StaticAnalysisSettings(
-            no=1))
-        
-        lst.append(rfem.loading.LoadCase(
+    def loads():
+        yield rfem.loading.StaticAnalysisSettings(no=1)
+        yield rfem.loading.LoadCase(
             no=1,
             name="Self weight",
-            static_analysis_settings=1))
-        
-        
-        # Create objects & run
-        rfem_app.create_object_list(lst)
-        rfem_app.calculate_all(skip_warnings=True)
-        results_grid_df = rfem_app.get_results(
-            results_type=rfem.results.STATIC_ANALYSIS_NODES_GLOBAL_DEFORMATIONS,
-        ).data
-        fea.max_deflection = results_grid_df["u_abs"].max()
-        print(results_grid_df)
-        print("✅ Bridge model exported and solved in RFEM")
+            static_analysis_settings=1)
+
+    return [
+        ("materials", 4, materials()),
+        ("nodes", fea.n_nodes, nodes()),
+        ("lines", fea.n_lines + len(new_lines), lines()),
+        ("members", n_members, members()),
+        ("surfaces", fea.n_surfaces + len(values), surfaces()),
+        ("supports", len(fea.supports), supports()),
+        ("loads", 2, loads()),
+    ]
+
+
+def build_objects(fea: FEAModel) -> list:
+    """Full RFEM object list for ``fea`` (materials through load cases)."""
+    return [obj for _, _, objs in export_stages(fea) for obj in objs]
+
+
+def _digest(obj) -> bytes:
+    return hashlib.blake2b(obj.SerializeToString(deterministic=True), digest_size=16).digest()
+
+
+def diff_objects(objs, previous: dict, state: dict = None) -> tuple[list, list]:
+    """Split ``objs`` against a previous push into (created, modified).
+
+    Digests of everything seen are recorded in ``state``; afterwards
+    ``deleted_objects(previous, state)`` gives what is gone.
+    """
+    state = {} if state is None else state
+    created, modified = [], []
+    for obj in objs:
+        key = (type(obj), obj.no)
+        digest = _digest(obj)
+        state[key] = digest
+        old = previous.get(key)
+        if old is None:
+            created.append(obj)
+        elif old != digest:
+            modified.append(obj)
+    return created, modified
+
+
+def deleted_objects(previous: dict, state: dict) -> list:
+    """Number-only stubs of objects no longer present, dependents (surfaces, members) first."""
+    return [cls(no=no) for cls, no in reversed(list(previous)) if (cls, no) not in state]
+
+
+def reset_export_state(model_name: str = None):
+    """Forget what was pushed (all models if no name), forcing a full re-export."""
+    if model_name is None:
+        _pushed.clear()
+        _model_ids.clear()
+    else:
+        _pushed.pop(model_name, None)
+        _model_ids.pop(model_name, None)
+
+
+def _stage_classes() -> dict[str, tuple[type, ...]]:
+    core, loading = rfem.structure_core, rfem.loading
+    return {
+        "materials": (core.Material, core.Section),
+        "nodes": (core.Node,),
+        "lines": (core.Line,),
+        "members": (core.Member,),
+        "surfaces": (core.Surface, core.Thickness),
+        "supports": (rfem.types_for_nodes.NodalSupport,),
+        "loads": (loading.StaticAnalysisSettings, loading.LoadCase),
+    }
+
+
+def _chunks(stages: list, previous: dict, state: dict, chunk_size: int, skip=()):
+    """Yield ``(stage, created, modified, n_done)`` for every ``chunk_size`` objects built.
+
+    Stages named in ``skip`` are not built; their objects are carried
+    over from ``previous`` unchanged.
+    """
+    classes = _stage_classes() if skip else {}
+    done = 0
+    for stage, _, objs in stages:
+        if stage in skip:
+            state.update((key, digest) for key, digest in previous.items() if key[0] in classes[stage])
+            continue
+        batch = []
+        for obj in objs:
+            batch.append(obj)
+            done += 1
+            if len(batch) >= chunk_size:
+                yield (stage, *diff_objects(batch, previous, state), done)
+                batch = []
+        if batch:
+            yield (stage, *diff_objects(batch, previous, state), done)
+
+
+def _prefetch(chunks, stop: threading.Event, depth: int = 2):
+    """Run the ``chunks`` generator in a thread, ``depth`` batches ahead of the consumer."""
+    q = queue.Queue(maxsize=depth)
+    end = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in chunks:
+                if not put(item):
+                    return
+            put(end)
+        except BaseException as e:
+            put(e)
+
+    threading.Thread(target=produce, daemon=True, name="rfem-export-builder").start()
+    while True:
+        item = q.get()
+        if item is end:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def push_objects(rfem_app, fea: FEAModel, previous: dict, chunk_size: int = CHUNK_SIZE,
+                 progress=None, cancel: threading.Event = None, only: set[str] = None,
+                 model_id=None) -> dict:
+    """Stream the changes of ``fea`` against ``previous`` to ``rfem_app``.
+
+    Objects are built lazily and sent stage by stage (nodes, lines, members,
+    surfaces, supports, loads) in chunks; the next chunk is built while the
+    current one is in flight, so memory stays bounded by a few chunks.
+    ``progress(done, total, stage)`` is called after each chunk and
+    ``cancel`` is checked between chunks. With ``only`` (stage names) the
+    other stages are assumed unchanged since ``previous`` and not rebuilt.
+    Calls go to ``model_id`` (the active model if None), so sessions
+    sharing one RFEM instance do not race on the active model.
+    Returns the new push state.
+    """
+    stages = export_stages(fea)
+    skip = set() if only is None or not previous else {name for name, _, _ in stages} - set(only)
+    total = sum(count for name, count, _ in stages if name not in skip)
+    state = {}
+    stop = threading.Event()
+    try:
+        chunks = _chunks(stages, previous, state, chunk_size, skip)
+        for stage, created, modified, done in _prefetch(chunks, stop):
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled(f"export cancelled during {stage}")
+            try:
+                with metrics.span("export.send", stage=stage, created=len(created), modified=len(modified)):
+                    if created:
+                        rfem_app.create_object_list(created, model_id=model_id)
+                    if modified:
+                        rfem_app.update_object_list(modified, model_id=model_id)
+                metrics.count("rfem.objects_sent", len(created) + len(modified))
+            except Exception as e:
+                nos = [o.no for o in created + modified]
+                raise ExportError(f"RFEM rejected {stage} chunk (objects {min(nos)}..{max(nos)}): {e}") from e
+            if progress is not None:
+                progress(done, total, stage)
+    finally:
+        stop.set()
+
+    deleted = deleted_objects(previous, state)
+    if deleted:
+        with metrics.span("export.send", stage="delete", deleted=len(deleted)):
+            rfem_app.delete_object_list(deleted, model_id=model_id)
+        metrics.count("rfem.objects_deleted", len(deleted))
+    return state
+
+
+def fea_to_rfem(fea: FEAModel, model_name="bridge_model", pool: rfem_session.SessionPool = None,
+                chunk_size: int = CHUNK_SIZE, progress=None, cancel: threading.Event = None,
+                use_cache: bool = True, changes=None):
+    """Export ``fea`` to RFEM, solve, and store ``fea.max_deflection``.
+
+    The first export of a model name creates the model from scratch; later
+    ones only send the objects that changed since the last push. Objects
+    are uploaded in chunks (see ``push_objects``). The connection is
+    leased from ``pool`` (the process-wide ``rfem_session`` pool by
+    default; tests pass one over ``rfem_stub``), so it is opened once per
+    process rather than once per export. The model is always pushed; if
+    the same model was solved before, its node deformations come from the
+    results cache and RFEM does not calculate or send results again.
+    ``changes`` is a ``regen.Changeset`` of everything changed since the
+    last export of this model; stages it does not touch are not rebuilt.
+
+    Node deformations end up in ``fea.displacements`` (row = node id - 1)
+    and ``fea.max_deflection``.
+    """
+    # taken out now and only put back once a push went through: any
+    # failure or cancellation on the way means a full re-export next time
+    previous = _pushed.pop(model_name, None)
+    key = columns = None
+    if use_cache:
+        key = results_cache.model_key(fea, _ANALYSIS)
+        columns = results_cache.get_cache().get(key)
+
+    pool = pool or rfem_session.get_pool()
+    with pool.lease() as rfem_app:
+        if previous is not None:
+            try:
+                rfem_app.set_active_model(model_id=_model_ids[model_name])
+            except Exception:
+                previous = None   # closed in RFEM (or RFEM restarted): start over
+        if previous is None:
+            _model_ids[model_name] = rfem_app.create_model(name=model_name)
+            rfem_app.delete_all_objects()
+            previous = {}
+        model_id = _model_ids[model_name]
+
+        only = None if changes is None else changes.export_stages
+        with metrics.span("export.push", nodes=fea.n_nodes, stages="all" if only is None else sorted(only)):
+            _pushed[model_name] = push_objects(rfem_app, fea, previous, chunk_size, progress, cancel,
+                                               only, model_id)
+
+        if columns is not None:
+            results.store_deformations(fea, columns)
+            metrics.count("export.cache_hits")
+            log.info("model %s exported, results loaded from cache", model_name)
+            return
+
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled("export cancelled before calculation")
+        with metrics.span("rfem.calculate"):
+            rfem_app.calculate_all(skip_warnings=True, model_id=model_id)
+        with metrics.span("rfem.results"):
+            columns = results.node_results(rfem_app, fea.n_nodes, model_id=model_id)
+        results.store_deformations(fea, columns)
+        if key is not None:
+            results_cache.get_cache().put(key, columns)
+        log.info("model %s exported and solved", model_name)
@@ -0,0 +1,150 @@
+"""Long-lived, pooled RFEM connections.
+
+Opening ``rfem.Application`` means a new gRPC channel and an API-key
+check, so connections are kept in a ``SessionPool`` and leased to exports
+and sweeps. At most ``size`` sessions exist, which also caps how many
+exports talk to RFEM at once (set it to the licence count). Idle
+sessions are health-checked before reuse and reconnected when the check
+fails or when the last lease ended with an error.
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LICENCES = int(os.environ.get("RFEM_LICENCES", "1"))
+HEALTH_INTERVAL = 30.0   # seconds a healthy idle session is trusted without a check
+
+
+class Session:
+    """One open RFEM application connection."""
+    def __init__(self, factory):
+        self._factory = factory
+        self._cm = None
+        self.app = None
+        self.connects = 0
+        self.checked = 0.0
+        self.suspect = False
+
+    def connect(self):
+        self.close()
+        cm = self._factory()
+        self.app = cm.__enter__()
+        self._cm = cm
+        self.connects += 1
+        self.checked = time.monotonic()
+        self.suspect = False
+
+    def healthy(self) -> bool:
+        if self.app is None:
+            return False
+        try:
+            self.app.get_application_info()
+        except Exception:
+            return False
+        self.checked = time.monotonic()
+        return True
+
+    def close(self):
+        if self._cm is not None:
+            cm, self._cm, self.app = self._cm, None, None
+            try:
+                cm.__exit__(None, None, None)
+            except Exception:
+                pass   # the connection is being dropped anyway
+
+
+class SessionPool:
+    """At most ``size`` RFEM sessions, leased one caller at a time."""
+    def __init__(self, factory=None, size: int = LICENCES, health_interval: float = HEALTH_INTERVAL):
+        if size < 1:
+            raise ValueError(f"pool size must be at least 1, got {size}")
+        self._factory = factory or _default_factory
+        self.size = size
+        self.health_interval = health_interval
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: list[Session] = []
+        self._lock = threading.Lock()
+        self._all: list[Session] = []
+
+    @contextmanager
+    def lease(self, timeout: float = None):
+        """Borrow a connected application (blocks while all ``size`` are in use)."""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"no RFEM session free within {timeout} s ({self.size} in use)")
+        session = None
+        try:
+            session = self._checkout()
+            try:
+                yield session.app
+            except BaseException:
+                # may have been the connection; check before the next lease
+                session.suspect = True
+                raise
+        finally:
+            if session is not None:
+                with self._lock:
+                    self._idle.append(session)
+            self._slots.release()
+
+    def _checkout(self) -> Session:
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+            if session is None:
+                session = Session(self._factory)
+                self._all.append(session)
+        try:
+            if session.app is None:
+                session.connect()
+            elif (session.suspect or time.monotonic() - session.checked > self.health_interval) \
+                    and not session.healthy():
+                session.connect()
+            else:
+                session.suspect = False
+        except BaseException:
+            session.close()
+            with self._lock:
+                self._all.remove(session)
+            raise
+        return session
+
+    @property
+    def connects(self) -> int:
+        """Connections opened so far (reconnects included)."""
+        return sum(s.connects for s in self._all)
+
+    def close(self):
+        with self._lock:
+            for session in self._all:
+                session.close()
+            self._idle.clear()
+            self._all.clear()
+
+
+def _default_factory():
+    from dlubal.api import rfem
+    from config import RFEM_KEY
+    return rfem.Application(api_key_value=RFEM_KEY)
+
+
+_pool: SessionPool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SessionPool:
+    """The process-wide pool, created on first use (one per sweep worker process)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def set_pool(pool: SessionPool):
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool is not pool:
+            _pool.close()
+        _pool = pool
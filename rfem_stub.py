@@ -0,0 +1,116 @@
+"""In-process stand-in for ``rfem.Application``.
+
+Keeps the pushed objects in memory and counts what each call sends, so
+exports can be exercised without an RFEM licence::
+
+    server = StubServer()
+    fea_to_rfem(fea, "m", pool=SessionPool(server.application))
+    server.sent["create"], server.sent["update"], server.sent["delete"]
+
+Setting ``server.down`` makes every call fail like a dropped connection;
+a connection that saw it stays broken after ``down`` is cleared, so the
+pool has to reconnect.
+"""
+from collections import Counter
+from types import SimpleNamespace
+
+import pandas as pd
+
+
+class StubServer:
+    """Shared state behind any number of ``StubApplication`` connections."""
+    def __init__(self):
+        self.models: dict[str, dict] = {}     # model name -> {(class, no): object}
+        self.active: str = None
+        self.sent = Counter()                 # objects per call kind
+        self.calls: list[str] = []
+        self.connections = 0                  # opened so far
+        self.open = 0                         # currently open
+        self.down = False
+
+    def application(self, **kwargs) -> "StubApplication":
+        self.connections += 1
+        return StubApplication(self)
+
+
+class StubApplication:
+    def __init__(self, server: StubServer):
+        self.server = server
+        self.lost = False
+
+    def __enter__(self):
+        if self.server.down:
+            raise ConnectionError("RFEM stub is down")
+        self.server.open += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_connection()
+        return False
+
+    def close_connection(self):
+        if self.server is not None:
+            self.server.open -= 1
+            self.server = None
+
+    def _model(self, model_id=None) -> dict:
+        return self.server.models[model_id.guid if model_id is not None else self.server.active]
+
+    def _log(self, call: str, n: int = 0):
+        if self.server is not None and self.server.down:
+            self.lost = True
+        if self.server is None or self.lost:
+            raise ConnectionError("RFEM stub connection lost")
+        self.server.calls.append(call)
+        self.server.sent[call] += n
+
+    def get_application_info(self):
+        self._log("get_application_info")
+        return SimpleNamespace(name="RFEM stub")
+
+    def create_model(self, *, name: str, template_path=None):
+        self._log("create_model")
+        self.server.models[name] = {}
+        self.server.active = name
+        return SimpleNamespace(guid=name)
+
+    def set_active_model(self, *, model_id):
+        self._log("set_active_model")
+        if model_id.guid not in self.server.models:
+            raise RuntimeError(f"model {model_id.guid!r} is not open")
+        self.server.active = model_id.guid
+
+    def delete_all_objects(self, model_id=None):
+        self._log("delete_all_objects")
+        self._model().clear()
+
+    def create_object_list(self, objs: list, model_id=None):
+        self._log("create", len(objs))
+        for obj in objs:
+            self._model(model_id)[(type(obj), obj.no)] = obj
+
+    def update_object_list(self, objs: list, model_id=None):
+        self._log("update", len(objs))
+        for obj in objs:
+            self._model(model_id)[(type(obj), obj.no)] = obj
+
+    def delete_object_list(self, objs: list, model_id=None):
+        self._log("delete", len(objs))
+        for obj in objs:
+            self._model(model_id).pop((type(obj), obj.no), None)
+
+    def calculate_all(self, *, skip_warnings: bool, model_id=None):
+        self._log("calculate_all")
+
+    def get_results(self, results_type=None, filters=None, model_id=None, **kwargs):
+        """Zero deformations for every node in the model (``node_no`` filters honoured)."""
+        self._log("get_results")
+        nodes = sorted(no for cls, no in self._model(model_id) if cls.__name__ == "Node")
+        for f in filters or []:
+            if f.column_id == "node_no":
+                wanted = {int(n) for n in f.filter_expression.split(",") if n}
+                nodes = [n for n in nodes if n in wanted]
+        zeros = [0.0] * len(nodes)
+        columns = ("u_x", "u_y", "u_z", "u_abs", "phi_x", "phi_y", "phi_z")
+        data = pd.DataFrame({"node_no": nodes, **{name: zeros for name in columns}})
+        return SimpleNamespace(data=data)
@@ -0,0 +1,347 @@
+"""Local linear-static solver: a fast preview of the RFEM analysis.
+
+Mirrors what ``rfem_conn.fea_to_rfem`` sends to RFEM: flange lines are
+beams with the rectangular flange section, crossframe lines are trusses
+(L 100x10), all surfaces are concrete shells, supports hold translations
+and the only load is self-weight. Like the export, coordinates are taken
+as metres, so displacements compare directly with RFEM's ``u_abs``.
+"""
+import hashlib
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+import metrics
+import results_cache
+from objects import FEAModel
+
+GRAVITY = 9.81  # m/s²
+
+# S450 and C30/37, as assigned by the RFEM export
+STEEL = dict(E=210e9, nu=0.3, rho=7850.0)
+CONCRETE = dict(E=33e9, nu=0.2, rho=2500.0)
+
+# L 100x10 crossframe angle
+ANGLE_AREA = 1.92e-3  # m²
+
+_CHUNK = 4096  # elements per batched stiffness evaluation
+
+_DOF_NAMES = ("u_x", "u_y", "u_z", "phi_x", "phi_y", "phi_z")
+
+
+def _beam_axes(p1: np.ndarray, p2: np.ndarray):
+    """Member lengths and local axes (rows x, y, z), local z as close to global Z as possible."""
+    d = p2 - p1
+    length = np.linalg.norm(d, axis=1)
+    ex = d / length[:, None]
+    ref = np.tile([0.0, 0.0, 1.0], (len(ex), 1))
+    ref[np.abs(ex[:, 2]) > 0.999] = (0.0, 1.0, 0.0)   # vertical members
+    ey = np.cross(ref, ex)
+    ey /= np.linalg.norm(ey, axis=1)[:, None]
+    ez = np.cross(ex, ey)
+    return length, np.stack([ex, ey, ez], axis=1)
+
+
+def _frame_stiffness(L, E, G, A, Iy, Iz, J) -> np.ndarray:
+    """Local 12x12 Euler-Bernoulli frame stiffness for each member (DOFs u v w rx ry rz per end)."""
+    k = np.zeros((len(L), 12, 12))
+    EA, GJ = E*A/L, G*J/L
+    k[:, 0, 0] = k[:, 6, 6] = EA
+    k[:, 0, 6] = -EA
+    k[:, 3, 3] = k[:, 9, 9] = GJ
+    k[:, 3, 9] = -GJ
+    # bending in the local x-y plane (v, rz)
+    a, b, c, d = 12*E*Iz/L**3, 6*E*Iz/L**2, 4*E*Iz/L, 2*E*Iz/L
+    k[:, 1, 1] = k[:, 7, 7] = a
+    k[:, 1, 7] = -a
+    k[:, 1, 5] = k[:, 1, 11] = b
+    k[:, 5, 7] = k[:, 7, 11] = -b
+    k[:, 5, 5] = k[:, 11, 11] = c
+    k[:, 5, 11] = d
+    # bending in the local x-z plane (w, ry)
+    a, b, c, d = 12*E*Iy/L**3, 6*E*Iy/L**2, 4*E*Iy/L, 2*E*Iy/L
+    k[:, 2, 2] = k[:, 8, 8] = a
+    k[:, 2, 8] = -a
+    k[:, 2, 4] = k[:, 2, 10] = -b
+    k[:, 4, 8] = k[:, 8, 10] = b
+    k[:, 4, 4] = k[:, 10, 10] = c
+    k[:, 4, 10] = d
+    return k + np.triu(k, 1).transpose(0, 2, 1)
+
+
+def _rotate(k_local: np.ndarray, R: np.ndarray) -> np.ndarray:
+    """Tᵀ k T with T block-diagonal in the 3x3 rotations ``R``."""
+    K, m = len(k_local), k_local.shape[1] // 3
+    # block by block (Rᵀ k_ab R), without forming the mostly-zero T
+    kb = k_local.reshape(K, m, 3, m, 3)
+    Rt = R.transpose(0, 2, 1)[:, None]
+    return (Rt[:, :, None] @ kb.transpose(0, 1, 3, 2, 4) @ R[:, None, None]).transpose(0, 1, 3, 2, 4).reshape(K, 3*m, 3*m)
+
+
+def _element_dofs(nodes: np.ndarray) -> np.ndarray:
+    """Global DOF numbers (6 per node) for each element's node list."""
+    return ((nodes[:, :, None] - 1) * 6 + np.arange(6)).reshape(len(nodes), -1)
+
+
+# --- shells: bilinear membrane + MITC4 plate + small drilling stiffness ---
+_XI = np.array([-1.0, 1.0, 1.0, -1.0])
+_ETA = np.array([-1.0, -1.0, 1.0, 1.0])
+_G = 1/np.sqrt(3)
+_GAUSS = [(-_G, -_G), (_G, -_G), (_G, _G), (-_G, _G)]
+
+
+def _shape(xi, eta):
+    N = 0.25 * (1 + xi*_XI) * (1 + eta*_ETA)
+    dN = np.stack([0.25 * _XI * (1 + eta*_ETA), 0.25 * _ETA * (1 + xi*_XI)])  # (2,4)
+    return N, dN
+
+
+def _jacobian(xy: np.ndarray, xi, eta):
+    N, dN = _shape(xi, eta)
+    J = np.einsum("ai,eib->eab", dN, xy)        # (K,2,2) rows d/dxi, d/deta
+    detJ = J[:, 0, 0]*J[:, 1, 1] - J[:, 0, 1]*J[:, 1, 0]
+    invJ = np.stack([np.stack([J[:, 1, 1], -J[:, 0, 1]], -1),
+                     np.stack([-J[:, 1, 0], J[:, 0, 0]], -1)], 1) / detJ[:, None, None]
+    dNxy = np.einsum("eab,bi->eai", invJ, dN)   # (K,2,4) d/dx, d/dy
+    return N, J, invJ, detJ, dNxy
+
+
+def _shear_b(N, dNxy):
+    """Mindlin shear strains (gxz, gyz) per plate DOF (w, rx, ry) of each node."""
+    K = len(dNxy)
+    B = np.zeros((K, 2, 12))
+    B[:, 0, 0::3] = dNxy[:, 0]
+    B[:, 0, 2::3] = N
+    B[:, 1, 0::3] = dNxy[:, 1]
+    B[:, 1, 1::3] = -N
+    return B
+
+
+def _shell_stiffness(xy: np.ndarray, t: np.ndarray, E: float, nu: float) -> np.ndarray:
+    """Local 24x24 flat-shell stiffness (DOFs u v w rx ry rz per node)."""
+    K = len(xy)
+    Dm = E*t/(1 - nu**2)
+    Db = E*t**3/(12*(1 - nu**2))
+    Ds = 5/6 * E/(2*(1 + nu)) * t
+    C = np.array([[1, nu, 0], [nu, 1, 0], [0, 0, (1 - nu)/2]])
+
+    # MITC4 tying points: covariant e_xi,z at A(0,1), C(0,-1); e_eta,z at B(-1,0), D(1,0)
+    tied = {}
+    for name, (xi, eta), row in (("A", (0, 1), 0), ("C", (0, -1), 0), ("B", (-1, 0), 1), ("D", (1, 0), 1)):
+        N, J, _, _, dNxy = _jacobian(xy, xi, eta)
+        tied[name] = np.einsum("eb,ebj->ej", J[:, row], _shear_b(N, dNxy))
+
+    km = np.zeros((K, 8, 8))
+    kp = np.zeros((K, 12, 12))
+    for xi, eta in _GAUSS:
+        N, J, invJ, detJ, dNxy = _jacobian(xy, xi, eta)
+        dx, dy = dNxy[:, 0], dNxy[:, 1]
+
+        Bm = np.zeros((K, 3, 8))
+        Bm[:, 0, 0::2] = dx
+        Bm[:, 1, 1::2] = dy
+        Bm[:, 2, 0::2] = dy
+        Bm[:, 2, 1::2] = dx
+        km += Bm.transpose(0, 2, 1) @ (C @ Bm) * (Dm*detJ)[:, None, None]
+
+        # curvatures: kx = d(ry)/dx, ky = -d(rx)/dy, kxy = d(ry)/dy - d(rx)/dx
+        Bb = np.zeros((K, 3, 12))
+        Bb[:, 0, 2::3] = dx
+        Bb[:, 1, 1::3] = -dy
+        Bb[:, 2, 2::3] = dy
+        Bb[:, 2, 1::3] = -dx
+        kp += Bb.transpose(0, 2, 1) @ (C @ Bb) * (Db*detJ)[:, None, None]
+
+        cov = np.stack([0.5*(1 + eta)*tied["A"] + 0.5*(1 - eta)*tied["C"],
+                        0.5*(1 + xi)*tied["D"] + 0.5*(1 - xi)*tied["B"]], axis=1)
+        Bs = invJ @ cov
+        kp += Bs.transpose(0, 2, 1) @ Bs * (Ds*detJ)[:, None, None]
+
+    k = np.zeros((K, 24, 24))
+    mem = (np.arange(4)[:, None]*6 + [0, 1]).ravel()
+    pla = (np.arange(4)[:, None]*6 + [2, 3, 4]).ravel()
+    k[:, mem[:, None], mem] = km
+    k[:, pla[:, None], pla] = kp
+    # fictitious drilling stiffness so in-plane rotations are not singular
+    drill = np.arange(4)*6 + 5
+    k[:, drill, drill] = 1e-3 * Db[:, None]
+    return k
+
+
+def _shell_stiffness_shared(xy: np.ndarray, t: np.ndarray, E: float, nu: float) -> np.ndarray:
+    """``_shell_stiffness`` worked out once per distinct shape and thickness.
+
+    Regular girder and deck meshes repeat a handful of quads, so this
+    skips nearly all of the per-element work.
+    """
+    key = np.round(np.column_stack([xy.reshape(len(xy), -1), t]), 9)
+    _, first, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+    return _shell_stiffness(xy[first], t[first], E, nu)[inverse.ravel()]
+
+
+def _shell_axes(p: np.ndarray):
+    """Local axes (rows e1, e2, e3) and in-plane node coordinates of each quad."""
+    e1 = p[:, 1] - p[:, 0]
+    e1 /= np.linalg.norm(e1, axis=1)[:, None]
+    e3 = np.cross(p[:, 2] - p[:, 0], p[:, 3] - p[:, 1])
+    e3 /= np.linalg.norm(e3, axis=1)[:, None]
+    e2 = np.cross(e3, e1)
+    R = np.stack([e1, e2, e3], axis=1)
+    xy = np.einsum("eab,enb->ena", R[:, :2], p - p[:, :1])
+    return R, xy
+
+
+def _quad_area(p: np.ndarray) -> np.ndarray:
+    return 0.5 * np.linalg.norm(np.cross(p[:, 2] - p[:, 0], p[:, 3] - p[:, 1]), axis=1)
+
+
+def _flange_section(fea: FEAModel):
+    """A, Iy, Iz, J of the rectangular flange section (width horizontal)."""
+    try:
+        b, t = float(fea.flange_width), float(fea.flange_thickness)
+    except AttributeError:
+        raise ValueError("FEAModel.flange_width/flange_thickness must be set before solving") from None
+    lo, hi = min(b, t), max(b, t)
+    J = hi * lo**3 * (1/3 - 0.21*lo/hi*(1 - lo**4/(12*hi**4)))
+    return b*t, b*t**3/12, t*b**3/12, J
+
+
+def assemble(fea: FEAModel, self_weight: bool = True):
+    """Global stiffness matrix (CSR) and self-weight load vector."""
+    ndof = 6 * fea.n_nodes
+    coords = fea.coords
+    rows, cols, vals = [], [], []
+    f = np.zeros(ndof)
+
+    def scatter(dofs, ke):
+        rows.append(np.repeat(dofs, dofs.shape[1], axis=1).ravel())
+        cols.append(np.tile(dofs, (1, dofs.shape[1])).ravel())
+        vals.append(ke.ravel())
+
+    def weight(nodes, w):
+        # lumped gravity load, -Z in model axes
+        np.add.at(f, (nodes - 1)*6 + 2, -w)
+
+    # frame members
+    flange = np.isin(fea.line_section, [c for c, s in enumerate(fea.sections) if "flange" in s])
+    cross = np.isin(fea.line_section, [c for c, s in enumerate(fea.sections) if "crossframe" in s])
+    E, nu, rho = STEEL["E"], STEEL["nu"], STEEL["rho"]
+    G = E / (2*(1 + nu))
+    if flange.any():
+        A, Iy, Iz, J = _flange_section(fea)
+    for mask, truss in ((flange, False), (cross, True)):
+        conn = fea.line_nodes[mask]
+        for s in range(0, len(conn), _CHUNK):
+            c = conn[s:s+_CHUNK]
+            L, R = _beam_axes(coords[c[:, 0] - 1], coords[c[:, 1] - 1])
+            if truss:
+                area = ANGLE_AREA
+                k = np.zeros((len(c), 12, 12))
+                k[:, 0, 0] = k[:, 6, 6] = E*area/L
+                k[:, 0, 6] = k[:, 6, 0] = -E*area/L
+            else:
+                area = A
+                k = _frame_stiffness(L, E, G, A, Iy, Iz, J)
+            scatter(_element_dofs(c), _rotate(k, R))
+            if self_weight:
+                w = 0.5 * rho * area * L * GRAVITY
+                weight(c[:, 0], w)
+                weight(c[:, 1], w)
+
+    # shells: steel webs, concrete deck (and anything else)
+    web = fea.surface_family == fea.family_code("web")
+    for mask, material in ((web, STEEL), (~web, CONCRETE)):
+        E, nu, rho = material["E"], material["nu"], material["rho"]
+        conn_all, t_all = fea.surface_nodes[mask], fea.surface_thickness[mask]
+        for s in range(0, len(conn_all), _CHUNK):
+            c, t = conn_all[s:s+_CHUNK], t_all[s:s+_CHUNK]
+            p = coords[c - 1]
+            R, xy = _shell_axes(p)
+            scatter(_element_dofs(c), _rotate(_shell_stiffness_shared(xy, t, E, nu), R))
+            if self_weight:
+                w = 0.25 * rho * t * _quad_area(p) * GRAVITY
+                for i in range(4):
+                    weight(c[:, i], w)
+
+    if not rows:
+        return sp.csr_matrix((ndof, ndof)), f
+    K = sp.coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(ndof, ndof)).tocsr()
+    return K, f
+
+
+def restrained_dofs(fea: FEAModel) -> np.ndarray:
+    """DOFs held by supports: translations, plus rotations for "fixed" supports."""
+    fixed = []
+    for s in fea.supports:
+        base = (np.asarray(s.node_ids) - 1) * 6
+        comps = range(6) if s.type == "fixed" else range(3)
+        fixed += [b + c for b in base for c in comps]
+    return np.unique(np.array(fixed, dtype=np.int64))
+
+
+def solve_linear_static(fea: FEAModel, self_weight: bool = True, nodal_loads=None,
+                        use_cache: bool = True) -> np.ndarray:
+    """Solve K u = f and store the result on ``fea``.
+
+    ``nodal_loads`` is an optional ``(n_nodes, 6)`` array of extra forces and
+    moments in model axes. Returns the ``(n_nodes, 6)`` displacement array
+    (ux, uy, uz, rx, ry, rz; row = node id - 1), also kept as
+    ``fea.displacements``; ``fea.max_deflection`` gets the largest
+    translation magnitude like RFEM's ``u_abs``. A model solved before
+    with the same loads is read back from the results cache.
+    """
+    if nodal_loads is not None:
+        nodal_loads = np.asarray(nodal_loads, dtype=np.float64).reshape(-1)
+    key = None
+    if use_cache:
+        key = results_cache.model_key(fea, _cache_settings(self_weight, nodal_loads))
+        columns = results_cache.get_cache().get(key)
+        if columns is not None:
+            metrics.count("solve.cache_hits")
+            return _store(fea, np.column_stack([columns[name] for name in _DOF_NAMES]))
+
+    with metrics.span("solve.assemble", nodes=fea.n_nodes):
+        K, f = assemble(fea, self_weight)
+    if nodal_loads is not None:
+        f += nodal_loads
+
+    # a support or load on a node no element uses would silently do nothing
+    attached = (K.diagonal().reshape(-1, 6)[:, :3] != 0).any(axis=1)
+    supported = np.unique(np.asarray([n for s in fea.supports for n in s.node_ids], dtype=np.int64))
+    loaded = np.flatnonzero(f.reshape(-1, 6).any(axis=1)) + 1
+    loose = [int(n) for n in np.union1d(supported, loaded) if not attached[n - 1]]
+    if loose:
+        raise ValueError(f"nodes {loose[:10]}{'...' if len(loose) > 10 else ''} carry supports or loads "
+                         "but belong to no element")
+
+    # DOFs nothing is attached to (e.g. rotations of truss-only or
+    # off-mesh support nodes) are held as well, as RFEM does.
+    free = np.ones(K.shape[0], dtype=bool)
+    free[restrained_dofs(fea)] = False
+    free &= K.diagonal() != 0
+
+    u = np.zeros(K.shape[0])
+    with metrics.span("solve.factor", dofs=int(free.sum())):
+        K_ff = K[free][:, free].tocsc()
+        u[free] = spla.spsolve(K_ff, f[free])
+    if not np.isfinite(u).all():
+        raise RuntimeError("stiffness matrix is singular - check supports and connectivity")
+
+    disp = u.reshape(-1, 6)
+    if key is not None:
+        results_cache.get_cache().put(key, dict(zip(_DOF_NAMES, disp.T)))
+    return _store(fea, disp)
+
+
+def _cache_settings(self_weight: bool, nodal_loads) -> dict:
+    loads = None if nodal_loads is None else hashlib.sha256(nodal_loads.tobytes()).hexdigest()
+    return {"analysis": "local-linear-static", "self_weight": self_weight, "nodal_loads": loads,
+            "steel": STEEL, "concrete": CONCRETE, "angle_area": ANGLE_AREA, "gravity": GRAVITY}
+
+
+def _store(fea: FEAModel, disp: np.ndarray) -> np.ndarray:
+    fea.displacements = disp
+    fea.max_deflection = float(np.linalg.norm(disp[:, :3], axis=1).max()) if len(disp) else 0.0
+    return disp
@@ -0,0 +1,141 @@
+"""Tolerance-aware spatial hash used to merge coincident FE nodes."""
+import math
+
+import numpy as np
+
+# Teschner et al. hashing primes. Cell indices stay below 2**36 for any
+# realistic bridge (|coord| < 1e8 ft at tol=1e-3), so the products fit in
+# int64 and NumPy and plain-int keys agree.
+_P1, _P2, _P3 = 73856093, 19349663, 83492791
+
+
+class SpatialHash:
+    """Uniform grid of cell size ``2*tol`` hashed into a dict.
+
+    Any point within ``tol`` of a query lies in the 2x2x2 block of cells
+    nearest to it, so a lookup probes at most eight cells. The hash stores
+    node ids only; coordinates are passed in (row ``id - 1``) when querying.
+    Bulk queries run on a key-sorted copy of the table (``searchsorted``
+    over the eight probe keys) instead of the dict.
+    """
+    def __init__(self, tol: float = 1e-3):
+        if tol <= 0:
+            raise ValueError(f"merge tolerance must be positive, got {tol}")
+        self.tol = tol
+        self.cell = 2.0 * tol
+        self._cells: dict[int, int | list[int]] = {}
+        self._count = 0
+        self._log: list = []          # (keys, ids) in insertion order, for the sorted table
+        self._table = None            # (sorted keys, ids), rebuilt after inserts
+
+    def __len__(self):
+        return self._count
+
+    # -- single point --
+    def _probe(self, x: float, y: float, z: float):
+        c = self.cell
+        out = []
+        for v in (x / c, y / c, z / c):
+            i = math.floor(v)
+            out.append((i, i - 1 if v - i < 0.5 else i + 1))
+        (ax, bx), (ay, by), (az, bz) = out
+        for i in (ax, bx):
+            hi = i * _P1
+            for j in (ay, by):
+                hij = hi ^ (j * _P2)
+                yield hij ^ (az * _P3)
+                yield hij ^ (bz * _P3)
+
+    def insert_one(self, nid: int, x: float, y: float, z: float):
+        c = self.cell
+        key = (math.floor(x / c) * _P1) ^ (math.floor(y / c) * _P2) ^ (math.floor(z / c) * _P3)
+        self._add(key, nid)
+        self._log.append((key, nid))
+        self._table = None
+
+    def query_one(self, x: float, y: float, z: float, points: np.ndarray) -> int:
+        """Id of the nearest stored point within ``tol`` of (x, y, z), else 0."""
+        best, best_d2 = 0, self.tol * self.tol
+        cells = self._cells
+        for key in self._probe(x, y, z):
+            hit = cells.get(key)
+            if hit is None:
+                continue
+            for nid in (hit if isinstance(hit, list) else (hit,)):
+                px, py, pz = points[nid - 1]
+                d2 = (px - x)**2 + (py - y)**2 + (pz - z)**2
+                if d2 <= best_d2:
+                    best, best_d2 = nid, d2
+        return best
+
+    # -- bulk --
+    def _keys(self, xyz: np.ndarray) -> np.ndarray:
+        cells = np.floor(xyz / self.cell).astype(np.int64)
+        return (cells[:, 0] * _P1) ^ (cells[:, 1] * _P2) ^ (cells[:, 2] * _P3)
+
+    def insert(self, ids, xyz):
+        """Insert ``(n,3)`` points under the given ids."""
+        xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+        keys, ids = self._keys(xyz), np.asarray(ids, dtype=np.int64).reshape(-1)
+        for key, nid in zip(keys.tolist(), ids.tolist()):
+            self._add(key, nid)
+        self._log.append((keys, ids))
+        self._table = None
+
+    def _sorted(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._table is None:
+            keys = np.concatenate([np.atleast_1d(k) for k, _ in self._log]).astype(np.int64)
+            ids = np.concatenate([np.atleast_1d(i) for _, i in self._log]).astype(np.int64)
+            self._log = [(keys, ids)]
+            order = np.argsort(keys, kind="stable")   # keeps insertion order within a cell
+            self._table = keys[order], ids[order]
+        return self._table
+
+    def query(self, xyz, points: np.ndarray) -> np.ndarray:
+        """Nearest stored id within ``tol`` for each of ``(n,3)`` points (0 = none).
+
+        Same answers as ``query_one`` point by point, ties included.
+        """
+        xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+        out = np.zeros(len(xyz), dtype=np.int32)
+        if not self._cells or not len(xyz):
+            return out
+        keys, ids = self._sorted()
+
+        # the 2x2x2 probe keys of every point, in query_one's order
+        v = xyz / self.cell
+        lo = np.floor(v)
+        near = np.stack([lo, np.where(v - lo < 0.5, lo - 1, lo + 1)], axis=-1).astype(np.int64)   # (n,3,2)
+        probe = ((near[:, 0, :, None, None] * _P1) ^ (near[:, 1, None, :, None] * _P2)
+                 ^ (near[:, 2, None, None, :] * _P3)).reshape(-1)
+
+        # every stored point in those cells, one row per (query, candidate)
+        start = np.searchsorted(keys, probe, "left")
+        count = np.searchsorted(keys, probe, "right") - start
+        if not count.any():
+            return out
+        owner = np.repeat(np.arange(len(probe)) // 8, count)
+        first = np.repeat(start - np.cumsum(count) + count, count)
+        cand = ids[first + np.arange(len(owner))]
+        d2 = ((points[cand - 1] - xyz[owner])**2).sum(axis=1)
+        hit = d2 <= self.tol * self.tol
+        owner, cand, d2, pos = owner[hit], cand[hit], d2[hit], np.flatnonzero(hit)
+        if not len(owner):
+            return out
+
+        # nearest per query; on a tie the last one probed wins, as in query_one
+        order = np.lexsort((-pos, d2, owner))
+        owner, cand = owner[order], cand[order]
+        best = np.r_[True, owner[1:] != owner[:-1]]
+        out[owner[best]] = cand[best]
+        return out
+
+    def _add(self, key: int, nid: int):
+        hit = self._cells.get(key)
+        if hit is None:
+            self._cells[key] = nid
+        elif isinstance(hit, list):
+            hit.append(nid)
+        else:
+            self._cells[key] = [hit, nid]
+        self._count += 1
@@ -0,0 +1,235 @@
+"""Headless parameter sweeps: generate and analyse many bridges in a process pool.
+
+Parameter sets use the ``BridgeUI.params`` schema; missing keys fall
+back to ``DEFAULTS``. Each case
+is meshed and solved in a worker process (the local solver, or RFEM) and
+one result row per case is appended to a CSV or Parquet file as soon as
+it finishes.
+
+    python sweep.py --grid girder_depth=1.5:3.0:0.25 --grid girder_spacing=[2.5,3,3.5] \\
+        --grid span_lengths=[[30,60,30],[40,80,40]] --out sweep.csv
+
+Results come back in completion order; the ``case`` column is the index
+into the case list.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from objects import build_fea, midspan_nodes
+from rfem_session import LICENCES
+
+# the BridgeUI defaults
+DEFAULTS = {
+    "span_lengths": [30.0],
+    "number_of_girders": 3,
+    "girder_spacing": 3.0,
+    "girder_depth": 2.0,
+    "web_thickness": 0.2,
+    "flange_width": 0.5,
+    "flange_thickness": 0.05,
+    "deck_thickness": 0.25,
+    "overhang": 0.5,
+    "mesh_size": 2.5,
+    "min_mesh_size": 0.0,
+    "element_budget": 0,
+    "crossframe_spacing": 5.0,
+}
+
+ENGINES = ("local", "rfem")
+
+
+def grid(base: dict = None, **axes) -> list[dict]:
+    """Cartesian product of the value lists in ``axes`` over ``base``."""
+    base = {**DEFAULTS, **(base or {})}
+    keys = list(axes)
+    return [{**base, **dict(zip(keys, values))} for values in itertools.product(*axes.values())]
+
+
+def run_case(case: int, params: dict, engine: str = "local") -> dict:
+    """Mesh and analyse one parameter set; returns a flat result row (errors included)."""
+    params = {**DEFAULTS, **params}
+    row = {"case": case, **{k: json.dumps(v) if isinstance(v, list) else v for k, v in params.items()}}
+    # failed cases keep the same columns and types
+    row.update(status="failed", error="", n_nodes=0, n_lines=0, n_surfaces=0, max_deflection=float("nan"),
+               span_over_deflection=float("nan"), midspan_deflection=float("nan"),
+               span_over_midspan_deflection=float("nan"), t_mesh=float("nan"), t_analysis=float("nan"))
+    try:
+        t0 = time.perf_counter()
+        fea = build_fea(params)
+        t1 = time.perf_counter()
+        if engine == "local":
+            from solver import solve_linear_static
+            solve_linear_static(fea)
+        elif engine == "rfem":
+            from rfem_conn import fea_to_rfem
+            # one RFEM model and pooled connection per worker, re-exported
+            # incrementally case after case
+            fea_to_rfem(fea, model_name=f"sweep_{os.getpid()}")
+        else:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {ENGINES}")
+        t2 = time.perf_counter()
+        span = max(params["span_lengths"])
+        # per span: the largest vertical deflection of the bottom flanges at midspan
+        mid = midspan_nodes(fea)
+        sag = np.abs(fea.displacements[mid - 1, 2]).max(axis=1) if mid.size else np.full(len(mid), np.nan)
+        spans = np.asarray(params["span_lengths"], dtype=np.float64)
+        sag = sag if len(sag) == len(spans) else np.full(len(spans), np.nan)
+        row.update(
+            status="ok", error="",
+            n_nodes=fea.n_nodes, n_lines=fea.n_lines, n_surfaces=fea.n_surfaces,
+            max_deflection=float(fea.max_deflection),
+            span_over_deflection=span / fea.max_deflection if fea.max_deflection else float("inf"),
+            midspan_deflection=float(sag.max()),
+            span_over_midspan_deflection=float((spans / sag).min()),
+            t_mesh=t1 - t0, t_analysis=t2 - t1,
+        )
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+class _CsvSink:
+    def __init__(self, path: Path):
+        self.file = open(path, "w", newline="")
+        self.writer = None
+
+    def write(self, row: dict):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(row))
+            self.writer.writeheader()
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetSink:
+    """Writes a row group every ``batch`` rows (pyarrow is needed for Parquet only)."""
+    def __init__(self, path: Path, batch: int = 64):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow); use a .csv file instead") from None
+        self.pa, self.pq, self.path, self.batch = pa, pq, path, batch
+        self.rows, self.writer, self.schema = [], None, None
+
+    def write(self, row: dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if self.schema is None:
+            self.schema = self.pa.Table.from_pylist(self.rows).schema
+            self.writer = self.pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _sink(path: Path):
+    return _ParquetSink(path) if path.suffix.lower() in (".parquet", ".pq") else _CsvSink(path)
+
+
+def sweep(cases: list[dict], out, engine: str = "local", workers: int = None, progress=None) -> int:
+    """Run ``cases`` in a process pool, streaming rows to ``out`` (.csv or .parquet).
+
+    ``workers`` defaults to all cores for the local solver and to the
+    RFEM licence count (``RFEM_LICENCES``) for RFEM, which it never exceeds.
+    ``progress(done, total, row)`` is called as rows arrive.
+    Returns the number of failed cases.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {ENGINES}")
+    if workers is None:
+        workers = os.cpu_count() if engine == "local" else LICENCES
+    elif engine == "rfem":
+        # each worker process opens its own RFEM connection
+        workers = min(workers, LICENCES)
+    sink = _sink(Path(out))
+    failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_case, i, params, engine) for i, params in enumerate(cases)]
+            for done, fut in enumerate(as_completed(futures), start=1):
+                row = fut.result()
+                failed += row["status"] != "ok"
+                sink.write(row)
+                if progress is not None:
+                    progress(done, len(cases), row)
+    finally:
+        sink.close()
+    return failed
+
+
+def _axis(spec: str) -> tuple[str, list]:
+    """``key=start:stop:step`` (stop included) or ``key=<JSON list>``."""
+    key, _, values = spec.partition("=")
+    if key not in DEFAULTS:
+        raise argparse.ArgumentTypeError(f"unknown parameter {key!r}")
+    if values.count(":") == 2 and not values.startswith("["):
+        start, stop, step = map(float, values.split(":"))
+        return key, np.round(np.arange(start, stop + step / 2, step), 10).tolist()
+    try:
+        parsed = json.loads(values)
+    except json.JSONDecodeError as e:
+        raise argparse.ArgumentTypeError(f"{spec}: {e}") from None
+    return key, parsed if isinstance(parsed, list) else [parsed]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--grid", action="append", type=_axis, default=[], metavar="KEY=VALUES",
+                    help="sweep axis: start:stop:step or a JSON list (repeatable)")
+    ap.add_argument("--cases", type=Path, help="JSON list (or JSON lines) of parameter sets instead of a grid")
+    ap.add_argument("--base", type=Path, help="JSON file of fixed parameters")
+    ap.add_argument("--out", type=Path, required=True, help="result file, .csv or .parquet")
+    ap.add_argument("--engine", choices=ENGINES, default="local")
+    ap.add_argument("--workers", type=int, help="processes (default: all cores; for rfem RFEM_LICENCES, also the maximum)")
+    args = ap.parse_args(argv)
+
+    base = json.loads(args.base.read_text()) if args.base else {}
+    if args.cases:
+        text = args.cases.read_text()
+        cases = json.loads(text) if text.lstrip().startswith("[") else \
+            [json.loads(line) for line in text.splitlines() if line.strip()]
+        cases = [{**DEFAULTS, **base, **c} for c in cases]
+        for key, values in args.grid:
+            cases = [{**c, key: v} for c in cases for v in values]
+    else:
+        cases = grid(base, **dict(args.grid))
+
+    t0 = time.perf_counter()
+
+    def progress(done, total, row):
+        status = f"{row['max_deflection']:.4g}" if row["status"] == "ok" else row["error"]
+        print(f"[{done}/{total}] case {row['case']}: {status}", file=sys.stderr)
+
+    try:
+        failed = sweep(cases, args.out, args.engine, args.workers, progress)
+    except RuntimeError as e:
+        ap.error(str(e))
+    print(f"{len(cases)} cases ({failed} failed) in {time.perf_counter() - t0:.1f} s -> {args.out}",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Background execution of long-running UI work (meshing, RFEM exports, LLM calls).
+
+Jobs run on a thread pool. Their status updates and results are queued
+and picked up by the Tk main loop with ``root.after``, so every callback
+runs on the main thread and may touch widgets. A callback that raises is
+reported through ``root.report_callback_exception`` like any Tk callback.
+"""
+import itertools
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Raised by ``Task.check`` when the task has been cancelled or superseded."""
+
+
+class Task:
+    """Handle passed to a job: cancel flag plus thread-safe status reporting."""
+    def __init__(self, scheduler, task_id: int, name: str, on_status=None):
+        self.id = task_id
+        self.name = name
+        self.cancel = threading.Event()
+        self.future = None
+        self.started = None
+        self._scheduler = scheduler
+        self._on_status = on_status
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel.is_set()
+
+    def check(self):
+        if self.cancel.is_set():
+            raise TaskCancelled(f"{self.name} cancelled")
+
+    def report(self, text: str):
+        """Queue a status line for the UI; safe to call from the worker."""
+        self._scheduler._events.put(("status", self, text))
+
+    def post(self, fn, *args):
+        """Queue ``fn(*args)`` to run on the UI thread (dropped once cancelled)."""
+        self._scheduler._events.put(("call", self, (fn, args)))
+
+
+class TaskScheduler:
+    """Thread pool whose results come back to Tk via ``root.after`` polling.
+
+    ``submit(name, fn, ...)`` runs ``fn(task)`` in the pool. Status lines
+    (queued, running, progress from ``task.report``, done/failed/cancelled)
+    go to ``on_status(task, text)``, and ``task.post(f, *args)`` runs
+    ``f`` on the main thread in order with them; the return value goes to
+    ``on_done(result)`` and exceptions to ``on_error(exc)``.
+
+    - ``supersede``: group name; a new task in the group cancels the
+      previous one, whose result is then dropped.
+    - ``exclusive``: key; tasks sharing it never run at the same time.
+      A later one waits in a queue of its own, not in a pool worker, so
+      queued exports cannot starve other tasks of workers.
+    """
+    def __init__(self, root, max_workers: int = 4, poll_ms: int = 50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="bridge-task")
+        self._events = queue.SimpleQueue()
+        self._ids = itertools.count(1)
+        self._latest: dict[str, Task] = {}
+        self._waiting: dict[str, deque] = {}    # exclusive key -> starters of queued tasks
+        self._busy: set[str] = set()              # exclusive keys with a task in the pool
+        self._guard = threading.Lock()
+        self._active: dict[int, Task] = {}
+        self._closed = False
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, name: str, fn, *, on_done=None, on_error=None, on_status=None,
+               supersede: str = None, exclusive: str = None) -> Task:
+        task = Task(self, next(self._ids), name, on_status)
+        if supersede is not None:
+            stale = self._latest.get(supersede)
+            if stale is not None:
+                stale.cancel.set()
+            self._latest[supersede] = task
+
+        def run():
+            task.check()
+            task.started = time.perf_counter()
+            task.report("running")
+            return fn(task)
+
+        self._active[task.id] = task
+        self._status(task, "queued")
+        if exclusive is None:
+            task.future = self._pool.submit(run)
+        else:
+            task.future = Future()
+            if not self._start_exclusive(exclusive, task, run):
+                task.report("waiting for the previous one to finish")
+        task.future.add_done_callback(lambda fut: self._events.put(("done", task, (on_done, on_error))))
+        return task
+
+    def cancel(self, group: str):
+        """Cancel the current task of a ``supersede`` group, if any."""
+        task = self._latest.get(group)
+        if task is not None and not task.future.done():
+            task.cancel.set()
+
+    def busy(self, group: str) -> bool:
+        task = self._latest.get(group)
+        return task is not None and not task.future.done()
+
+    def shutdown(self):
+        """Cancel everything; running jobs see their cancel flag, queued ones never start."""
+        self._closed = True
+        for task in list(self._active.values()):
+            task.cancel.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _start_exclusive(self, key: str, task: Task, run) -> bool:
+        """Run ``run`` in the pool once no other ``key`` task is; False if it had to queue."""
+        def start():
+            if not self._closed:
+                try:
+                    self._pool.submit(call)
+                    return
+                except RuntimeError:
+                    pass   # shut down meanwhile
+            task.future.cancel()
+            self._release(key)
+
+        def call():
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    try:
+                        result = run()
+                    except BaseException as e:
+                        task.future.set_exception(e)
+                    else:
+                        task.future.set_result(result)
+            finally:
+                self._release(key)
+
+        with self._guard:
+            if key in self._busy:
+                self._waiting.setdefault(key, deque()).append(start)
+                return False
+            self._busy.add(key)
+        start()
+        return True
+
+    def _release(self, key: str):
+        """Start the next queued ``key`` task, or mark the key free."""
+        with self._guard:
+            waiting = self._waiting.get(key)
+            if not waiting:
+                self._waiting.pop(key, None)
+                self._busy.discard(key)
+                return
+            start = waiting.popleft()
+        start()
+
+    def _status(self, task: Task, text: str):
+        if task._on_status is not None:
+            task._on_status(task, text)
+
+    def _poll(self):
+        if self._closed:
+            return
+        try:
+            while True:
+                try:
+                    kind, task, payload = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._dispatch(kind, task, payload)
+                except Exception:
+                    # a failing UI callback must not stop the polling
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            self.root.after(self.poll_ms, self._poll)
+
+    def _dispatch(self, kind: str, task: Task, payload):
+        if kind == "status":
+            if not task.cancelled:
+                self._status(task, payload)
+        elif kind == "call":
+            if not task.cancelled:
+                fn, args = payload
+                fn(*args)
+        else:
+            self._finish(task, *payload)
+
+    def _finish(self, task: Task, on_done, on_error):
+        self._active.pop(task.id, None)
+        fut = task.future
+        exc = None if fut.cancelled() else fut.exception()
+        if task.cancelled or fut.cancelled():
+            # whatever a cancelled job returned or raised is stale
+            self._status(task, "cancelled")
+            return
+        elapsed = f" ({time.perf_counter() - task.started:.1f} s)" if task.started else ""
+        if exc is not None:
+            self._status(task, f"failed{elapsed}: {exc}")
+            if on_error is not None:
+                on_error(exc)
+            return
+        self._status(task, f"done{elapsed}")
+        if on_done is not None:
+            on_done(fut.result())
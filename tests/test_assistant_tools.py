@@ -0,0 +1,63 @@
+"""Assistant tools: parameter bounds and the calls the model can make."""
+import json
+
+import pytest
+
+import results_cache
+from assistant import BridgeTools, invalid_parameters
+from regen import BridgeModel
+from sweep import DEFAULTS
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path):
+    results_cache.set_cache(results_cache.ResultsCache(tmp_path / "results"))
+
+
+def test_defaults_are_valid():
+    assert invalid_parameters(DEFAULTS) == {}
+
+
+@pytest.mark.parametrize("name, value", [
+    ("girder_depth", 0), ("girder_depth", -1.0), ("girder_depth", "2"), ("mesh_size", float("nan")),
+    ("number_of_girders", 0), ("number_of_girders", 2.5), ("number_of_girders", True),
+    ("overhang", -0.1), ("element_budget", -1), ("span_lengths", []), ("span_lengths", [30.0, 0.0]),
+    ("span_lengths", 30.0),
+])
+def test_out_of_bounds(name, value):
+    assert set(invalid_parameters({**DEFAULTS, name: value})) == {name}
+
+
+@pytest.mark.parametrize("name, value", [
+    ("overhang", 0), ("min_mesh_size", 0.0), ("element_budget", 0), ("number_of_girders", 1), ("girder_depth", 3),
+])
+def test_on_the_bound(name, value):
+    assert invalid_parameters({**DEFAULTS, name: value}) == {}
+
+
+def test_set_parameters_rejects_all_or_nothing():
+    changed = []
+    tools = BridgeTools(DEFAULTS, on_change=changed.append)
+    result = json.loads(tools.call("set_parameters", json.dumps({"girder_depth": 2.5, "mesh_size": -1})))
+    assert set(result["invalid"]) == {"mesh_size"}
+    assert tools.params == DEFAULTS and not changed
+    assert "error" in json.loads(tools.call("set_parameters", json.dumps({"depth": 2.5})))
+    assert json.loads(tools.call("set_parameters", json.dumps({"girder_depth": 2.5}))) == \
+        {"updated": {"girder_depth": 2.5}}
+    assert changed == [{"girder_depth": 2.5}]
+
+
+def test_changed_parameters_leave_the_ui_model_alone():
+    model = BridgeModel(DEFAULTS)
+    tools = BridgeTools(DEFAULTS, model)
+    assert "error" in json.loads(tools.call("get_span_results", "{}"))
+    tools.call("set_parameters", json.dumps({"girder_depth": 3.0}))
+    report = json.loads(tools.call("run_code_checks", json.dumps({"rule_set": "EC"})))
+    assert report["spans"] and model.fea.displacements is None
+    assert model.params["girder_depth"] == DEFAULTS["girder_depth"]
+
+
+def test_unknown_tool_and_bad_arguments_are_errors():
+    tools = BridgeTools(DEFAULTS)
+    assert "error" in json.loads(tools.call("delete_everything", "{}"))
+    assert "error" in json.loads(tools.call("get_parameters", "{not json"))
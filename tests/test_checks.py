@@ -0,0 +1,50 @@
+"""Per-span code checks on synthetic and solved displacements."""
+import numpy as np
+import pytest
+
+from checks import RULE_SETS, check_model, check_spans, span_deflections
+from objects import build_fea, span_ranges
+from sweep import DEFAULTS
+
+SPANS = [30.0, 60.0, 30.0]
+
+
+@pytest.fixture
+def fea():
+    fea = build_fea({**DEFAULTS, "span_lengths": SPANS})
+    fea.displacements = np.random.default_rng(0).normal(size=(fea.n_nodes, 6)) * 1e-2
+    return fea
+
+
+def test_span_deflections_match_a_loop(fea):
+    x, uz = fea.coords[:, 0], np.abs(fea.displacements[:, 2])
+    expected = []
+    for i, (a, b) in enumerate(span_ranges(fea)):
+        # nodes on a pier belong to the span that starts there (the last pier to the last span)
+        inside = (x >= a) & ((x < b) | (i == len(SPANS) - 1) & (x <= b + fea.tol))
+        expected.append(uz[inside].max())
+    np.testing.assert_allclose(span_deflections(fea), expected)
+
+
+def test_check_spans_limits_and_utilisation(fea):
+    fea.displacements[:] = 0
+    fea.displacements[np.argmin(np.abs(fea.coords[:, 0] - 45.0)), 2] = -0.15   # 1.25 x L/500 on span 2
+    report = check_spans(fea, "EC")
+    assert [s["length"] for s in report["spans"]] == SPANS
+    assert [s["ok"] for s in report["spans"]] == [True, False, True]
+    assert report["spans"][1]["deflection_utilisation"] == pytest.approx(1.25)
+    assert report["spans"][0]["span_depth_limit"] == RULE_SETS["EC"].span_depth_continuous
+    assert report["spans"][1]["span_depth"] == pytest.approx(60.0 / DEFAULTS["girder_depth"])
+    assert report["ok"] is False
+
+
+def test_unsolved_model_checks_span_depth_only():
+    report = check_spans(build_fea(DEFAULTS), "AASHTO")
+    (span,) = report["spans"]
+    assert "max_deflection" not in span
+    assert span["span_depth_limit"] == RULE_SETS["AASHTO"].span_depth_simple
+    assert span["ok"] == (30.0 / DEFAULTS["girder_depth"] <= span["span_depth_limit"])
+
+
+def test_check_model_runs_every_rule_set(fea):
+    assert set(check_model(fea)) == set(RULE_SETS)
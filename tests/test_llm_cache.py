@@ -0,0 +1,94 @@
+"""LLM completion cache: keys, TTL, LRU eviction, offline mode, deduplication."""
+import threading
+import time
+
+import pytest
+
+import llm_cache
+from llm_cache import CacheMiss, LLMCache, request_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+def test_key_ignores_whitespace_only():
+    key = request_key("m", "sys", "make it  deeper", {"a": 1}, temperature=0)
+    assert key == request_key("m", " sys ", "make it deeper\n", {"a": 1}, temperature=0)
+    assert key != request_key("m", "sys", "make it deeper", {"a": 2}, temperature=0)
+    assert key != request_key("m", "sys", "make it deeper", {"a": 1}, temperature=0.5)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LLMCache(":memory:", ttl=60, offline=False)
+    cache.put("k", "answer")
+    clock.now += 59
+    assert cache.get("k") == "answer"
+    clock.now += 2
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = LLMCache(":memory:", max_entries=2, offline=False)
+    cache.put("a", "1")
+    clock.now += 1
+    cache.put("b", "2")
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.put("c", "3")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+
+
+def test_persists_across_instances(tmp_path):
+    LLMCache(tmp_path / "llm.sqlite3", offline=False).put("k", "answer")
+    assert LLMCache(tmp_path / "llm.sqlite3", offline=False).get("k") == "answer"
+
+
+def test_offline_miss_raises_without_fetching():
+    cache = LLMCache(":memory:", offline=True)
+    cache.put("hit", "answer")
+    assert cache.complete("hit", lambda: pytest.fail("fetched")) == "answer"
+    with pytest.raises(CacheMiss):
+        cache.complete("miss", lambda: pytest.fail("fetched"))
+
+
+def test_identical_requests_fetch_once():
+    cache = LLMCache(":memory:", offline=False)
+    release, calls, results = threading.Event(), [], []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    threads = [threading.Thread(target=lambda: results.append(cache.complete("k", fetch))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)         # the others queue up behind the first fetch
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1 and results == ["answer"] * 4
+
+
+def test_failed_fetch_is_not_cached():
+    cache = LLMCache(":memory:", offline=False)
+
+    def down():
+        raise RuntimeError("api down")
+
+    with pytest.raises(RuntimeError):
+        cache.complete("k", down)
+    assert cache.complete("k", lambda: "answer") == "answer"
@@ -0,0 +1,54 @@
+"""JsonStreamParser fed an answer in every possible split."""
+import json
+
+import pytest
+
+from llm_stream import JsonStreamParser
+
+ANSWERS = [
+    {"message": 'Deeper girders: "2.5 m" \\ ok é✓ \U0001F309\nnext line'},
+    {"girder_depth": 2.5, "span_lengths": [30.0, {"a": "}"}], "note": "a, b: c"},
+    {"message": ""},
+]
+
+
+def feed(text: str, chunks) -> tuple[JsonStreamParser, list, list]:
+    fields, deltas = [], []
+    parser = JsonStreamParser(on_field=lambda k, v: fields.append((k, v)), on_text=deltas.append)
+    pos = 0
+    for end in chunks:
+        parser.feed(text[pos:end])
+        pos = end
+    parser.feed(text[pos:])
+    return parser, fields, deltas
+
+
+@pytest.mark.parametrize("answer", ANSWERS)
+@pytest.mark.parametrize("ascii_only", [True, False])
+def test_every_two_chunk_split(answer, ascii_only):
+    text = json.dumps(answer, ensure_ascii=ascii_only)
+    for cut in range(len(text) + 1):
+        parser, fields, deltas = feed(text, [cut])
+        assert parser.complete and parser.close() == answer
+        assert fields == list(answer.items())
+        assert "".join(deltas) == answer.get("message", "")
+
+
+def test_character_by_character_streams_message_text():
+    answer = ANSWERS[0]
+    text = json.dumps(answer)
+    parser, _, deltas = feed(text, range(1, len(text)))
+    assert "".join(deltas) == answer["message"]
+    assert len(deltas) > 1          # reported while it was still arriving
+
+
+def test_code_fence_around_the_object_is_ignored():
+    text = "```json\n" + json.dumps(ANSWERS[1]) + "\n```"
+    parser, fields, _ = feed(text, range(1, len(text), 3))
+    assert parser.close() == ANSWERS[1] and len(fields) == len(ANSWERS[1])
+
+
+def test_not_an_object_raises_on_close():
+    parser, _, _ = feed("[1, 2]", [3])
+    with pytest.raises(ValueError):
+        parser.close()
@@ -0,0 +1,66 @@
+"""Graded stations (adaptive_stations) and the conforming mesh built on them."""
+import warnings
+
+import numpy as np
+import pytest
+
+from objects import adaptive_stations, build_fea, crossframe_positions, curvature_indicator
+from solver import solve_linear_static
+from sweep import DEFAULTS
+
+SPANS = [30.0, 60.0, 30.0]
+GRADED = {**DEFAULTS, "span_lengths": SPANS, "mesh_size": 2.5, "min_mesh_size": 0.25}
+
+
+def stations(**kw):
+    supports = np.concatenate([[0], np.cumsum(SPANS)]).tolist()
+    crossframes = crossframe_positions(SPANS, DEFAULTS["crossframe_spacing"])
+    return np.array(adaptive_stations(0, sum(SPANS), crossframes, supports, 0.25, 2.5, **kw)), crossframes
+
+
+def test_graded_mesh_is_conforming():
+    fea = build_fea(GRADED)
+    # deck, webs and flanges share nodes instead of stacking duplicates
+    assert len(np.unique(np.round(fea.coords, 6), axis=0)) == fea.n_nodes
+    used = np.union1d(fea.line_nodes.ravel(), fea.surface_nodes.ravel())
+    assert np.array_equal(used, np.arange(1, fea.n_nodes + 1))
+    x = np.unique(np.round(fea.coords[:, 0], 6))
+    for cut in np.concatenate([[0], np.cumsum(SPANS), crossframe_positions(SPANS, DEFAULTS["crossframe_spacing"])]):
+        assert np.abs(x - cut).min() < 1e-6
+    solve_linear_static(fea, use_cache=False)
+
+
+def test_grading_refines_at_supports():
+    x, _ = stations()
+    h = np.diff(x)
+    assert h[0] == pytest.approx(0.25, rel=0.2)
+    assert h.max() <= 2.5 + 1e-9
+
+
+@pytest.mark.parametrize("budget", [120, 80])
+def test_budget_is_kept(budget):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        x, crossframes = stations(budget=budget)
+    assert len(x) - 1 <= budget
+    assert all(np.abs(x - c).min() < 1e-9 for c in crossframes)
+
+
+def test_budget_that_forces_coarse_elements_warns():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        stations(budget=200)            # fits without going past mesh_size
+    with pytest.warns(UserWarning, match="element budget 80"):
+        stations(budget=80)
+
+
+def test_indicator_refines_where_it_is_large():
+    fea = build_fea(GRADED)
+    solve_linear_static(fea, use_cache=False)
+    ix, eta = curvature_indicator(fea)
+    assert len(ix) == len(eta) and eta.max() > 0
+    # a synthetic indicator peaking at x = 45 pulls elements there
+    plain, _ = stations()
+    steered, _ = stations(indicator=([0, 45, 120], [0, 1, 0]))
+    near = lambda x: ((x > 40) & (x < 50)).sum()
+    assert near(steered) > near(plain)
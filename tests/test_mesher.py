@@ -0,0 +1,67 @@
+"""The vectorized mesher against a node-by-node reference mesher."""
+import numpy as np
+import pytest
+
+from objects import FEAModel, build_fea, crossframe_positions, generate_stations
+from sweep import DEFAULTS
+
+
+def reference_fea(params: dict) -> FEAModel:
+    """The segment-by-segment mesher the array code replaced, one lookup per node."""
+    fea = FEAModel()
+    spans = params["span_lengths"]
+    total = sum(spans)
+    supports = np.concatenate([[0], np.cumsum(spans)]).tolist()
+    crossframes = crossframe_positions(spans, params["crossframe_spacing"])
+    stations = generate_stations(0, total, crossframes, params["mesh_size"], supports=supports)
+    depth, n_g = params["girder_depth"], params["number_of_girders"]
+    ys = [i * params["girder_spacing"] for i in range(n_g)]
+    node = fea.get_or_create_node
+
+    for y in ys:
+        for xa, xb in zip(stations[:-1], stations[1:]):
+            n1, n2 = node(xa, y, depth), node(xb, y, depth)
+            n3, n4 = node(xa, y, 0), node(xb, y, 0)
+            fea.add_line(n1, n2, "beam", "top_flange")
+            fea.add_line(n3, n4, "beam", "bottom_flange")
+            fea.add_surface(n1, n2, n4, n3, params["web_thickness"], family="web")
+    for y1, y2 in zip(ys[:-1], ys[1:]):
+        for x in crossframes:
+            n1, n2, n3, n4 = node(x, y1, depth), node(x, y2, depth), node(x, y1, 0), node(x, y2, 0)
+            fea.add_line(n1, n4, "truss", "crossframe")
+            fea.add_line(n3, n2, "truss", "crossframe")
+            fea.add_line(n1, n3, "beam", "crossframe")
+            fea.add_line(n2, n4, "beam", "crossframe")
+    for x in supports:
+        for y in ys:
+            fea.add_support([node(x, y, 0).id], "pinned")
+    rows = [ys[0] - params["overhang"]] + ys + [ys[-1] + params["overhang"]]
+    for y1, y2 in zip(rows[:-1], rows[1:]):
+        for xa, xb in zip(stations[:-1], stations[1:]):
+            fea.add_surface(node(xa, y1, depth), node(xb, y1, depth), node(xb, y2, depth), node(xa, y2, depth),
+                            params["deck_thickness"], family="deck")
+    return fea
+
+
+def names(fea, categories, codes):
+    return np.array(getattr(fea, categories), dtype=object)[codes].tolist()
+
+
+@pytest.mark.parametrize("changes", [
+    {},
+    {"span_lengths": [30.0, 60.0, 30.0], "mesh_size": 1.5},
+    {"number_of_girders": 1, "overhang": 1.0},
+    {"number_of_girders": 4, "overhang": 0.0, "crossframe_spacing": 7.0},
+], ids=["default", "multi-span", "one-girder", "no-overhang"])
+def test_vectorized_mesh_matches_reference(changes):
+    params = {**DEFAULTS, **changes}
+    fea, ref = build_fea(params), reference_fea(params)
+    assert fea.n_nodes == ref.n_nodes
+    np.testing.assert_array_equal(fea.coords, ref.coords)
+    np.testing.assert_array_equal(fea.line_nodes, ref.line_nodes)
+    assert names(fea, "sections", fea.line_section) == names(ref, "sections", ref.line_section)
+    assert names(fea, "line_types", fea.line_type) == names(ref, "line_types", ref.line_type)
+    np.testing.assert_array_equal(fea.surface_nodes, ref.surface_nodes)
+    np.testing.assert_array_equal(fea.surface_thickness, ref.surface_thickness)
+    assert names(fea, "surface_families", fea.surface_family) == names(ref, "surface_families", ref.surface_family)
+    assert [(s.node_ids, s.type) for s in fea.supports] == [(s.node_ids, s.type) for s in ref.supports]
@@ -0,0 +1,61 @@
+"""Metrics: no-op while disabled, span/counter statistics, trace outputs."""
+import json
+
+import pytest
+
+import metrics
+from objects import build_fea
+from sweep import DEFAULTS
+
+
+@pytest.fixture
+def enabled(tmp_path):
+    metrics.registry.reset()
+    metrics.enable(tmp_path / "trace.jsonl")
+    yield tmp_path / "trace.jsonl"
+    metrics.disable()
+    metrics.registry.reset()
+
+
+def test_disabled_records_nothing():
+    metrics.disable()
+    metrics.registry.reset()
+    with metrics.span("x") as sp:
+        sp.set(n=1)
+    metrics.count("c")
+    assert metrics.snapshot() == {"spans": {}, "counters": {}}
+    assert metrics.span("x") is metrics.span("y")       # the shared no-op
+
+
+def test_spans_and_counters(enabled):
+    for _ in range(3):
+        with metrics.span("work", size=2):
+            pass
+    with pytest.raises(KeyError):
+        with metrics.span("work"):
+            raise KeyError
+    metrics.count("items", 5)
+    metrics.count("items")
+    snap = metrics.snapshot()
+    assert snap["spans"]["work"]["count"] == 4
+    assert snap["spans"]["work"]["max"] >= snap["spans"]["work"]["mean"] > 0
+    assert snap["counters"] == {"items": 6}
+    assert "work" in metrics.format_snapshot(snap)
+    lines = [json.loads(line) for line in enabled.read_text().splitlines()]
+    assert [line.get("span") for line in lines[:4]] == ["work"] * 4
+    assert lines[3]["error"] == "KeyError" and lines[0]["size"] == 2
+
+
+def test_chrome_trace(enabled, tmp_path):
+    with metrics.span("outer"):
+        metrics.count("n", 2)
+    metrics.export_chrome_trace(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert [(e["name"], e["ph"]) for e in events] == [("n", "C"), ("outer", "X")]
+
+
+def test_generate_is_instrumented(enabled):
+    fea = build_fea(DEFAULTS)
+    snap = metrics.snapshot()
+    assert snap["spans"]["generate"]["count"] == 1
+    assert snap["counters"]["fea.nodes_created"] == fea.n_nodes
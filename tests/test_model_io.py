@@ -0,0 +1,84 @@
+"""Binary model files: round trip, copy-on-write maps, saving over a mapped file."""
+import numpy as np
+import pytest
+
+import model_io
+import results_cache
+from model_io import ModelFormatError, load_model, save_model
+from objects import build_fea
+from regen import BridgeModel
+from solver import solve_linear_static
+from sweep import DEFAULTS
+
+PARAMS = {**DEFAULTS, "span_lengths": [30.0, 40.0]}
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path):
+    results_cache.set_cache(results_cache.ResultsCache(tmp_path / "results"))
+
+
+def assert_same(a, b):
+    for name in model_io.ARRAYS:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+    assert (a.line_types, a.sections, a.surface_families) == (b.line_types, b.sections, b.surface_families)
+    assert [(s.id, list(s.node_ids), s.type) for s in a.supports] == \
+        [(s.id, list(s.node_ids), s.type) for s in b.supports]
+    assert (a.flange_width, a.flange_thickness, a.tol) == (b.flange_width, b.flange_thickness, b.tol)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, mmap):
+    fea = build_fea(PARAMS)
+    solve_linear_static(fea, use_cache=False)
+    save_model(tmp_path / "m.bridge", fea, PARAMS)
+    loaded, params = load_model(tmp_path / "m.bridge", mmap=mmap)
+    assert params == PARAMS
+    assert_same(loaded, fea)
+    np.testing.assert_array_equal(loaded.displacements, fea.displacements)
+    assert loaded.max_deflection == fea.max_deflection
+    # the loaded model is a working model: node lookup and analysis
+    assert loaded.get_or_create_node(*fea.coords[5]).id == 6
+    assert solve_linear_static(loaded, use_cache=False) == pytest.approx(fea.displacements)
+
+
+def test_unsolved_model_round_trip(tmp_path):
+    fea = build_fea(DEFAULTS)
+    save_model(tmp_path / "m.bridge", fea)
+    loaded, params = load_model(tmp_path / "m.bridge")
+    assert params is None and loaded.displacements is None
+    assert_same(loaded, fea)
+
+
+def test_edits_to_a_mapped_model_stay_in_memory(tmp_path):
+    path = tmp_path / "m.bridge"
+    save_model(path, build_fea(PARAMS), PARAMS)
+    before = path.read_bytes()
+    fea, params = load_model(path)
+    assert model_io._mapped_file(fea.coords) is not None
+    model = BridgeModel(params, fea)
+    model.update({"girder_depth": 2.5, "deck_thickness": 0.3})
+    assert path.read_bytes() == before
+    assert_same(model.fea, build_fea({**PARAMS, "girder_depth": 2.5, "deck_thickness": 0.3}))
+
+
+def test_save_over_the_file_a_model_is_mapped_from(tmp_path):
+    path = tmp_path / "m.bridge"
+    save_model(path, build_fea(PARAMS), PARAMS)
+    fea, params = load_model(path)
+    fea.surface_thickness[:] = 0.4
+    save_model(path, fea, params)
+    assert model_io._mapped_file(fea.coords) is None        # detached before the write
+    assert (load_model(path)[0].surface_thickness == 0.4).all()
+
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "x.bridge").write_bytes(b"not a model at all")
+    with pytest.raises(ModelFormatError):
+        load_model(tmp_path / "x.bridge")
+    save_model(tmp_path / "new.bridge", build_fea(DEFAULTS))
+    data = bytearray((tmp_path / "new.bridge").read_bytes())
+    data[8:12] = (model_io.VERSION + 1).to_bytes(4, "little")
+    (tmp_path / "new.bridge").write_bytes(bytes(data))
+    with pytest.raises(ModelFormatError, match="version"):
+        load_model(tmp_path / "new.bridge")
@@ -0,0 +1,14 @@
+"""FEAModel storage: category codes."""
+import pytest
+
+from objects import FEAModel
+
+
+def test_category_codes_bounded():
+    fea = FEAModel()
+    a, b = fea.get_or_create_node(0, 0, 0), fea.get_or_create_node(1, 0, 0)
+    for k in range(128):
+        fea.add_line(a, b, section=f"S{k}")
+    assert fea.line_section[-1] == 127
+    with pytest.raises(ValueError):
+        fea.add_line(a, b, section="S128")
@@ -0,0 +1,37 @@
+"""BridgeModel.update in place against a fresh build_fea."""
+import numpy as np
+import pytest
+
+from objects import build_fea
+from regen import BridgeModel
+from solver import solve_linear_static
+from sweep import DEFAULTS
+
+BASE = {**DEFAULTS, "span_lengths": [20.0, 25.0], "mesh_size": 1.5}
+
+
+@pytest.mark.parametrize("changes", [
+    {"girder_depth": 2.6},
+    {"girder_spacing": 3.4, "overhang": 0.8},
+    {"deck_thickness": 0.3, "web_thickness": 0.15},
+    {"flange_width": 0.6, "flange_thickness": 0.04},
+], ids=["depth", "spacing", "thickness", "section"])
+def test_update_in_place_matches_fresh_build(changes):
+    model = BridgeModel(BASE)
+    cs = model.update(changes)
+    assert not cs.rebuilt
+    fresh = build_fea({**BASE, **changes})
+    fea = model.fea
+    np.testing.assert_allclose(fea.coords, fresh.coords, atol=1e-12)
+    np.testing.assert_array_equal(fea.line_nodes, fresh.line_nodes)
+    np.testing.assert_array_equal(fea.surface_nodes, fresh.surface_nodes)
+    np.testing.assert_array_equal(fea.surface_thickness, fresh.surface_thickness)
+    assert (fea.flange_width, fea.flange_thickness) == (fresh.flange_width, fresh.flange_thickness)
+    assert solve_linear_static(fea, use_cache=False) == pytest.approx(
+        solve_linear_static(fresh, use_cache=False), abs=1e-12)
+
+
+def test_topology_change_rebuilds():
+    model = BridgeModel(BASE)
+    assert model.update({"number_of_girders": 4}).rebuilt
+    assert model.fea.n_nodes == build_fea({**BASE, "number_of_girders": 4}).n_nodes
@@ -0,0 +1,78 @@
+"""draw_3d: batched artists and the coarse level of detail."""
+import matplotlib
+import pytest
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from mpl_toolkits.mplot3d.art3d import Line3DCollection, Path3DCollection, Poly3DCollection  # noqa: E402
+
+from objects import build_fea  # noqa: E402
+from render import draw_3d  # noqa: E402
+from sweep import DEFAULTS  # noqa: E402
+
+PARAMS = {**DEFAULTS, "span_lengths": [30.0, 40.0]}
+
+
+@pytest.fixture
+def ax():
+    fig = plt.figure()
+    yield fig.add_subplot(111, projection="3d")
+    plt.close(fig)
+
+
+def drawn(ax) -> dict:
+    """Artist kind -> primitives per artist, after a draw (paths are projected then)."""
+    ax.figure.canvas.draw()
+    out = {}
+    for c in ax.collections:
+        n = len(c.get_offsets()) if isinstance(c, Path3DCollection) else len(c.get_paths())
+        out.setdefault(type(c), []).append(n)
+    return out
+
+
+def test_full_detail_is_one_artist_per_section_and_family(ax):
+    fea = build_fea(PARAMS)
+    draw_3d(fea, ax, lod="full")
+    art = drawn(ax)
+    assert len(art[Line3DCollection]) == len(fea.sections)
+    assert len(art[Poly3DCollection]) == len(fea.surface_families)
+    assert sum(art[Line3DCollection]) == fea.n_lines
+    assert sum(art[Poly3DCollection]) == fea.n_surfaces
+    supports = sum(len(s.node_ids) for s in fea.supports)
+    assert sorted(art[Path3DCollection]) == sorted([supports, fea.n_nodes])
+
+
+def test_artist_count_does_not_grow_with_the_mesh(ax):
+    counts = []
+    for mesh_size in (2.5, 0.5):
+        draw_3d(build_fea({**PARAMS, "mesh_size": mesh_size}), ax, lod="full")
+        counts.append(len(ax.collections))
+    assert counts[0] == counts[1]
+
+
+def test_coarse_preview_does_not_depend_on_mesh_size(ax):
+    counts = []
+    for mesh_size in (2.5, 0.5):
+        draw_3d(build_fea({**PARAMS, "mesh_size": mesh_size}), ax, lod="coarse")
+        art = drawn(ax)
+        counts.append((art[Line3DCollection], art[Poly3DCollection], art[Path3DCollection]))
+    assert counts[0] == counts[1]
+
+
+def test_auto_switches_to_coarse_above_threshold(ax, monkeypatch):
+    import render
+    fea = build_fea(PARAMS)
+    draw_3d(fea, ax)
+    assert sum(drawn(ax)[Poly3DCollection]) == fea.n_surfaces
+    monkeypatch.setattr(render, "LOD_THRESHOLD", fea.n_lines + fea.n_surfaces - 1)
+    draw_3d(fea, ax)
+    assert sum(drawn(ax)[Poly3DCollection]) < fea.n_surfaces
+
+
+def test_span_is_drawn_in_full_detail(ax):
+    fea = build_fea({**PARAMS, "mesh_size": 0.5})
+    draw_3d(fea, ax, lod="coarse")
+    coarse = sum(drawn(ax)[Poly3DCollection])
+    draw_3d(fea, ax, span=(0.0, 30.0))
+    inside = (fea.coords[fea.surface_nodes - 1, 0] <= 30.0 + fea.tol).all(axis=1).sum()
+    assert sum(drawn(ax)[Poly3DCollection]) > inside > coarse
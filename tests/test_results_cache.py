@@ -0,0 +1,70 @@
+"""Results cache: model key, hits after a solve, invalidation and eviction."""
+import os
+
+import numpy as np
+import pytest
+
+import results_cache
+from objects import build_fea
+from solver import solve_linear_static
+from sweep import DEFAULTS
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = results_cache.ResultsCache(tmp_path / "results")
+    results_cache.set_cache(cache)
+    return cache
+
+
+def key(fea, **settings):
+    return results_cache.model_key(fea, {"analysis": "test", **settings})
+
+
+def test_key_is_stable_across_rebuilds():
+    assert key(build_fea(DEFAULTS)) == key(build_fea(DEFAULTS))
+
+
+@pytest.mark.parametrize("change", [
+    {"girder_depth": 2.1}, {"deck_thickness": 0.3}, {"web_thickness": 0.15},
+    {"flange_width": 0.6}, {"mesh_size": 1.0}, {"number_of_girders": 4},
+])
+def test_key_changes_with_the_model(change):
+    assert key(build_fea(DEFAULTS)) != key(build_fea({**DEFAULTS, **change}))
+
+
+def test_key_changes_with_settings_and_supports():
+    fea = build_fea(DEFAULTS)
+    base = key(fea)
+    assert key(fea, self_weight=False) != base
+    fea.supports[0].type = "fixed"
+    assert key(fea) != base
+
+
+def test_solve_hits_cache_and_in_place_edit_misses(cache):
+    fea = build_fea(DEFAULTS)
+    first = solve_linear_static(fea).copy()
+    assert (cache.hits, cache.misses) == (0, 1)
+    again = build_fea(DEFAULTS)
+    np.testing.assert_array_equal(solve_linear_static(again), first)
+    assert cache.hits == 1
+    again.surface_thickness[:] *= 2      # edited in place, same topology
+    solve_linear_static(again)
+    assert cache.misses == 2
+
+
+def test_put_get_round_trip_and_corrupt_entry(cache):
+    cache.put("k", {"u_z": np.arange(3.0)})
+    np.testing.assert_array_equal(cache.get("k")["u_z"], np.arange(3.0))
+    cache._path("k").write_bytes(b"not an npz")
+    assert cache.get("k") is None
+
+
+def test_evicts_least_recently_used(cache):
+    for i, name in enumerate("abc"):
+        cache.put(name, {"x": np.random.default_rng(i).random(1000)})
+        os.utime(cache._path(name), (i, i))
+    cache.get("a")                       # refreshes a: b is now the oldest
+    cache.max_bytes = sum(p.stat().st_size for p in cache.directory.glob("*.npz")) - 1
+    cache.evict()
+    assert sorted(p.stem for p in cache.directory.glob("*.npz")) == ["a", "c"]
@@ -0,0 +1,81 @@
+"""Incremental RFEM export against the in-process stub."""
+import pytest
+from dlubal.api import rfem
+
+import results_cache
+import rfem_conn
+from objects import build_fea
+from rfem_session import SessionPool
+from rfem_stub import StubApplication, StubServer
+from sweep import DEFAULTS
+
+MODEL = "test_model"
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path):
+    results_cache.set_cache(results_cache.ResultsCache(tmp_path / "results"))
+    rfem_conn.reset_export_state()
+    yield
+    rfem_conn.reset_export_state()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = StubServer()
+    server.objects = {"create": [], "update": [], "delete": []}   # what the last export sent
+    for call in server.objects:
+        method = getattr(StubApplication, f"{call}_object_list")
+
+        def record(self, objs, model_id=None, _call=call, _method=method):
+            server.objects[_call] += objs
+            return _method(self, objs, model_id=model_id)
+        monkeypatch.setattr(StubApplication, f"{call}_object_list", record)
+    return server
+
+
+def export(server, fea):
+    for objs in server.objects.values():
+        objs.clear()
+    server.sent.clear()
+    rfem_conn.fea_to_rfem(fea, MODEL, pool=SessionPool(server.application), use_cache=False)
+
+
+def sent(server) -> int:
+    return server.sent["create"] + server.sent["update"] + server.sent["delete"]
+
+
+def test_repeat_export_sends_nothing(server):
+    fea = build_fea(DEFAULTS)
+    export(server, fea)
+    assert server.sent["create"] == len(rfem_conn.build_objects(fea))
+    export(server, fea)
+    assert sent(server) == 0
+
+
+def test_thickness_edit_sends_only_thickness(server):
+    export(server, build_fea(DEFAULTS))
+    export(server, build_fea({**DEFAULTS, "deck_thickness": 0.3}))
+    changed = server.objects["create"] + server.objects["update"]
+    assert changed and sent(server) == len(changed)
+    assert {type(o) for o in changed} <= {rfem.structure_core.Thickness, rfem.structure_core.Surface}
+    assert [o.uniform_thickness for o in changed if isinstance(o, rfem.structure_core.Thickness)] == [0.3]
+
+
+def test_webs_are_steel_and_deck_concrete():
+    # same value on both families still gives two Thickness objects
+    fea = build_fea({**DEFAULTS, "web_thickness": 0.25, "deck_thickness": 0.25})
+    thicknesses = [o for o in rfem_conn.build_objects(fea) if isinstance(o, rfem.structure_core.Thickness)]
+    assert [(o.material, o.uniform_thickness) for o in thicknesses] == [(1, 0.25), (2, 0.25)]
+    assert len(thicknesses[0].assigned_to_surfaces) == int((fea.surface_family == fea.family_code("web")).sum())
+
+
+def test_deletion_deletes_removed_numbers(server):
+    before = build_fea({**DEFAULTS, "number_of_girders": 3})
+    after = build_fea({**DEFAULTS, "number_of_girders": 2})
+    export(server, before)
+    export(server, after)
+    old = {(type(o), o.no) for o in rfem_conn.build_objects(before)}
+    new = {(type(o), o.no) for o in rfem_conn.build_objects(after)}
+    assert {(type(o), o.no) for o in server.objects["delete"]} == old - new
+    assert set(server.models[MODEL]) == new
@@ -0,0 +1,76 @@
+"""SessionPool over the in-process RFEM stub."""
+import threading
+import time
+
+import pytest
+
+import results_cache
+import rfem_conn
+from objects import build_fea
+from rfem_session import SessionPool
+from rfem_stub import StubServer
+from sweep import DEFAULTS
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path):
+    results_cache.set_cache(results_cache.ResultsCache(tmp_path / "results"))
+    rfem_conn.reset_export_state()
+    yield
+    rfem_conn.reset_export_state()
+
+
+def test_one_connection_across_exports():
+    server = StubServer()
+    pool = SessionPool(server.application)
+    fea = build_fea(DEFAULTS)
+    for _ in range(3):
+        rfem_conn.fea_to_rfem(fea, "m", pool=pool, use_cache=False)
+    assert server.connections == 1
+    assert server.calls.count("calculate_all") == 3
+
+
+def test_reconnect_after_server_down():
+    server = StubServer()
+    pool = SessionPool(server.application)
+    fea = build_fea(DEFAULTS)
+    rfem_conn.fea_to_rfem(fea, "m", pool=pool, use_cache=False)
+
+    server.down = True
+    with pytest.raises(ConnectionError):
+        rfem_conn.fea_to_rfem(fea, "m", pool=pool, use_cache=False)
+    server.down = False
+
+    rfem_conn.fea_to_rfem(fea, "m", pool=pool, use_cache=False)
+    assert server.connections == 2
+    assert pool.connects == 2
+
+
+def test_max_sessions_caps_concurrent_leases():
+    server = StubServer()
+    pool = SessionPool(server.application, size=2)
+    lock = threading.Lock()
+    active = peak = 0
+
+    def work():
+        nonlocal active, peak
+        with pool.lease():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == 2
+    assert server.connections == 2
+
+    with pool.lease(), pool.lease():
+        with pytest.raises(TimeoutError):
+            with pool.lease(timeout=0.01):
+                pass
@@ -0,0 +1,89 @@
+"""Local solver against closed-form beam and plate results."""
+import numpy as np
+import pytest
+
+import solver
+from objects import FEAModel, build_fea
+from solver import GRAVITY, STEEL, solve_linear_static
+from sweep import DEFAULTS
+
+L, B, T = 10.0, 0.5, 0.05     # beam length, flange width and thickness
+
+
+def beam(n=40, supports=("fixed", None)) -> FEAModel:
+    """``n`` flange elements along x; ``supports`` for the first and last node."""
+    fea = FEAModel()
+    fea.flange_width, fea.flange_thickness = B, T
+    nodes = [fea.get_or_create_node(L * i / n, 0, 0) for i in range(n + 1)]
+    for a, b in zip(nodes[:-1], nodes[1:]):
+        fea.add_line(a, b, "beam", "bottom_flange")
+    for node, kind in zip((nodes[0], nodes[-1]), supports):
+        if kind is not None:
+            fea.add_support([node.id], kind)
+    return fea
+
+
+def weight_per_length():
+    return STEEL["rho"] * B * T * GRAVITY
+
+
+def test_cantilever_self_weight():
+    u = solve_linear_static(beam(), use_cache=False)
+    EI = STEEL["E"] * B * T**3 / 12
+    assert -u[-1, 2] == pytest.approx(weight_per_length() * L**4 / (8 * EI), rel=1e-3)
+
+
+def test_cantilever_weak_axis_tip_load():
+    fea = beam()
+    P = 1e3
+    loads = np.zeros((fea.n_nodes, 6))
+    loads[-1, 1] = P
+    u = solve_linear_static(fea, self_weight=False, nodal_loads=loads, use_cache=False)
+    EI = STEEL["E"] * T * B**3 / 12
+    assert u[-1, 1] == pytest.approx(P * L**3 / (3 * EI), rel=1e-6)
+
+
+def test_fixed_fixed_self_weight():
+    n = 40
+    u = solve_linear_static(beam(n, ("fixed", "fixed")), use_cache=False)
+    EI = STEEL["E"] * B * T**3 / 12
+    assert -u[n // 2, 2] == pytest.approx(weight_per_length() * L**4 / (384 * EI), rel=1e-6)
+
+
+@pytest.mark.parametrize("nx, ny", [(20, 4), (40, 8)])
+def test_cantilevered_plate_strip(monkeypatch, nx, ny):
+    # nu = 0: no anticlastic bending, so the free sides do not matter
+    monkeypatch.setitem(solver.CONCRETE, "nu", 0.0)
+    length, width, t = 4.0, 1.0, 0.1
+    fea = FEAModel()
+    xs, ys = np.meshgrid(np.linspace(0, length, nx + 1), np.linspace(0, width, ny + 1), indexing="ij")
+    ids = fea.add_nodes(np.column_stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)])).reshape(nx + 1, ny + 1)
+    quads = np.stack([ids[:-1, :-1], ids[1:, :-1], ids[1:, 1:], ids[:-1, 1:]], axis=-1).reshape(-1, 4)
+    fea.add_surfaces(quads, t, family="deck")
+    fea.add_support(ids[0].tolist(), "fixed")
+
+    u = solve_linear_static(fea, use_cache=False)
+    q = solver.CONCRETE["rho"] * t * GRAVITY
+    D = solver.CONCRETE["E"] * t**3 / 12
+    assert -u[ids[-1] - 1, 2].mean() == pytest.approx(q * length**4 / (8 * D), rel=1e-3)
+
+
+def test_multi_span_piers_are_supported():
+    # mesh sizes that do not divide the pier bays still put a station on every pier
+    results = []
+    for mesh_size in (0.5, 1.5, 2.0):
+        fea = build_fea({**DEFAULTS, "span_lengths": [30.0, 60.0, 30.0], "mesh_size": mesh_size})
+        used = np.union1d(fea.line_nodes.ravel(), fea.surface_nodes.ravel())
+        assert np.isin([n for s in fea.supports for n in s.node_ids], used).all()
+        solve_linear_static(fea, use_cache=False)
+        results.append(fea.max_deflection)
+    # coarse meshes come out somewhat stiff (webs are a single row of long quads)
+    assert results[1] == pytest.approx(results[0], rel=0.1)
+    assert results[2] == pytest.approx(results[0], rel=0.25)
+
+
+def test_support_on_loose_node_raises():
+    fea = beam()
+    fea.add_support([fea.get_or_create_node(5.0, 1.0, 0).id], "pinned")
+    with pytest.raises(ValueError, match="belong to no element"):
+        solve_linear_static(fea, use_cache=False)
@@ -0,0 +1,56 @@
+"""Node merging tolerance: SpatialHash and FEAModel.get_or_create_node(s)."""
+import numpy as np
+import pytest
+
+from objects import FEAModel
+from spatial import SpatialHash
+
+TOL = 1e-3
+
+
+def table(points):
+    points = np.asarray(points, dtype=np.float64)
+    h = SpatialHash(TOL)
+    h.insert(np.arange(1, len(points) + 1), points)
+    return h, points
+
+
+@pytest.mark.parametrize("offset, found", [(0.999 * TOL, 1), (TOL, 1), (1.001 * TOL, 0)])
+def test_tolerance_boundary(offset, found):
+    h, points = table([[1.0, 2.0, 3.0]])
+    q = [[1.0 + offset, 2.0, 3.0]]
+    assert h.query(q, points).tolist() == [found]
+    assert h.query_one(*q[0], points) == found
+
+
+def test_points_straddling_a_cell_boundary():
+    cell = 2 * TOL
+    # stored just below a cell boundary, queried just above it (and diagonally)
+    h, points = table([[cell - 1e-5, cell - 1e-5, -1e-5]])
+    q = np.array([[cell + 4e-4, cell + 4e-4, 4e-4], [cell + 1.2e-3, cell, 0.0]])
+    assert h.query(q, points).tolist() == [1, 0]
+    assert [h.query_one(*p, points) for p in q] == [1, 0]
+
+
+def test_nearest_wins_and_bulk_matches_single():
+    rng = np.random.default_rng(1)
+    points = np.round(rng.uniform(-0.01, 0.01, (400, 3)), 4)
+    h, _ = table(points[:300])
+    for i in range(300, 400):
+        h.insert_one(i + 1, *points[i])
+    q = points + rng.normal(0, 0.6 * TOL, points.shape)
+    bulk = h.query(q, points)
+    assert bulk.tolist() == [h.query_one(*p, points) for p in q]
+    d = np.linalg.norm(points[bulk[bulk > 0] - 1] - q[bulk > 0], axis=1)
+    assert (d <= TOL).all()
+
+
+def test_merged_nodes_counts_only_snapped_points():
+    fea = FEAModel(TOL)
+    a = fea.get_or_create_node(0.0, 0.0, 0.0)
+    assert fea.get_or_create_node(0.0, 0.0, 0.0) == a and fea.merged_nodes == 0
+    assert fea.get_or_create_node(0.5 * TOL, 0.0, 0.0) == a and fea.merged_nodes == 1
+    ids = fea.get_or_create_nodes([[0.0, 0.0, 0.0], [0.0, 0.5 * TOL, 0.0], [1.0, 0.0, 0.0]])
+    assert ids.tolist() == [a.id, a.id, 2]
+    assert fea.merged_nodes == 2
+    assert fea.n_nodes == 2
@@ -0,0 +1,43 @@
+"""Sweep rows from run_case with the local solver."""
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import results_cache
+import sweep
+from sweep import DEFAULTS, run_case
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path):
+    results_cache.set_cache(results_cache.ResultsCache(tmp_path / "results"))
+
+
+def test_row_has_per_span_midspan_check():
+    row = run_case(0, {**DEFAULTS, "span_lengths": [30.0, 60.0, 30.0]}, "local")
+    assert row["status"] == "ok", row["error"]
+    assert row["midspan_deflection"] == pytest.approx(row["max_deflection"], rel=0.05)
+    assert row["span_over_midspan_deflection"] == pytest.approx(60.0 / row["midspan_deflection"])
+
+
+def test_failed_row_keeps_columns():
+    ok = run_case(0, DEFAULTS, "local")
+    failed = run_case(1, {**DEFAULTS, "number_of_girders": 0}, "local")
+    assert failed["status"] == "failed" and list(failed) == list(ok)
+    assert math.isnan(failed["midspan_deflection"])
+
+
+@pytest.mark.parametrize("engine, workers, expected", [("rfem", 8, sweep.LICENCES), ("rfem", None, sweep.LICENCES),
+                                                      ("local", 8, 8)])
+def test_rfem_workers_capped_at_licences(monkeypatch, tmp_path, engine, workers, expected):
+    used = []
+
+    class Pool(ThreadPoolExecutor):
+        def __init__(self, max_workers):
+            used.append(max_workers)
+            super().__init__(max_workers)
+    monkeypatch.setattr(sweep, "ProcessPoolExecutor", Pool)
+    monkeypatch.setattr(sweep, "run_case", lambda case, params, engine: {"case": case, "status": "ok"})
+    assert sweep.sweep([DEFAULTS] * 3, tmp_path / "out.csv", engine, workers) == 0
+    assert used == [expected]
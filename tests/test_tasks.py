@@ -0,0 +1,106 @@
+"""TaskScheduler driven by a fake Tk root."""
+import threading
+import time
+
+import pytest
+
+from tasks import TaskScheduler
+
+
+class FakeRoot:
+    def __init__(self):
+        self.pending = []
+        self.errors = []
+
+    def after(self, ms, fn):
+        self.pending.append(fn)
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        self.errors.append(exc)
+
+    def pump(self, until, timeout=5.0):
+        """Run the queued ``after`` callbacks until ``until()`` holds."""
+        deadline = time.monotonic() + timeout
+        while not until():
+            assert time.monotonic() < deadline, "timed out"
+            callbacks, self.pending = self.pending, []
+            for fn in callbacks:
+                fn()
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def scheduler():
+    root = FakeRoot()
+    s = TaskScheduler(root, max_workers=2)
+    yield s
+    s.shutdown()
+
+
+def test_results_and_status_come_back_through_poll(scheduler):
+    statuses, results = [], []
+    scheduler.submit("job", lambda task: 42, on_done=results.append,
+                     on_status=lambda task, text: statuses.append(text))
+    scheduler.root.pump(lambda: results)
+    assert results == [42]
+    assert statuses[0] == "queued" and statuses[-1].startswith("done")
+
+
+def test_raising_callback_keeps_polling(scheduler):
+    def boom(result):
+        raise RuntimeError("redraw failed")
+
+    results = []
+    scheduler.submit("first", lambda task: 1, on_done=boom)
+    scheduler.root.pump(lambda: scheduler.root.errors)
+    scheduler.submit("second", lambda task: 2, on_done=results.append)
+    scheduler.root.pump(lambda: results)
+    assert results == [2]
+    assert [str(e) for e in scheduler.root.errors] == ["redraw failed"]
+
+
+def test_exclusive_tasks_queue_outside_the_pool(scheduler):
+    gate = threading.Event()
+    running, peak, order = [0], [0], []
+    lock = threading.Lock()
+
+    def export(i):
+        def fn(task):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            gate.wait(5)
+            with lock:
+                running[0] -= 1
+            order.append(i)
+            return i
+        return fn
+
+    done = []
+    exports = [scheduler.submit(f"export {i}", export(i), on_done=done.append, exclusive="rfem:m")
+               for i in range(4)]
+    # two workers, four queued exports: other work still gets a worker
+    other = []
+    scheduler.submit("generate", lambda task: "mesh", on_done=other.append)
+    scheduler.root.pump(lambda: other)
+
+    exports[2].cancel.set()
+    gate.set()
+    scheduler.root.pump(lambda: len(done) == 3 and all(t.future.done() for t in exports))
+    assert order == [0, 1, 3] and done == [0, 1, 3]
+    assert peak[0] == 1
+    assert not scheduler._busy and not scheduler._waiting
+
+
+def test_exclusive_queue_drains_after_shutdown(scheduler):
+    gate = threading.Event()
+    first = scheduler.submit("export 0", lambda task: gate.wait(5), exclusive="rfem:m")
+    queued = [scheduler.submit(f"export {i}", lambda task: i, exclusive="rfem:m") for i in (1, 2)]
+    scheduler.shutdown()
+    gate.set()
+    first.future.result(5)
+    for task in queued:
+        with pytest.raises(Exception):
+            task.future.result(5)
+        assert task.future.cancelled()
+    assert not scheduler._busy and not scheduler._waiting